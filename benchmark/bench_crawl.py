@@ -0,0 +1,153 @@
+"""
+Benchmark whole crawls against a local synthetic site, for a range of worker counts, and record pages/sec, fetch latency
+percentiles, CPU time and peak RSS.
+
+Each crawl runs in its own process, so its CPU time and peak RSS are not mixed up with the site's or the other crawls'.
+With --output, the results are appended to a JSON lines file, along with the commit they were measured on, so that
+regressions show up across commits.
+
+Run with: python -m benchmark.bench_crawl --workers 1 8 32 --output benchmark-results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from benchmark.site import SyntheticSite
+from src.main import main
+
+
+async def _crawl(start_url: str, workers: int, max_pages: int) -> dict[str, float]:
+    """
+    Crawl the site once, in this process, and measure it.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        metrics_path = os.path.join(directory, "metrics.json")
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        pages = await main(start_url, workers, max_pages, progress_interval=0, metrics_json_path=metrics_path)
+        duration = time.perf_counter() - start
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        with open(metrics_path, encoding="utf-8") as metrics_file:
+            metrics = json.load(metrics_file)
+
+    cpu_seconds = usage.ru_utime - usage_start.ru_utime + usage.ru_stime - usage_start.ru_stime
+    # ru_maxrss is in KiB on Linux, but in bytes on macOS.
+    peak_rss_bytes = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {
+        "workers": workers,
+        "pages": pages,
+        "failed": metrics["pages_failed_total"],
+        "seconds": duration,
+        "pages_per_sec": pages / duration,
+        "fetch_p50_ms": 1000 * metrics["fetch_seconds"]["p50"],
+        "fetch_p99_ms": 1000 * metrics["fetch_seconds"]["p99"],
+        "cpu_seconds": cpu_seconds,
+        "cpu_share": cpu_seconds / duration,
+        "peak_rss_mib": peak_rss_bytes / 1024 / 1024,
+    }
+
+
+async def _run(args: argparse.Namespace) -> None:
+    site = SyntheticSite(
+        pages=args.pages,
+        fan_out=args.fan_out,
+        page_weight=args.page_weight,
+        seed=args.seed,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    await site.start()
+    results = []
+    try:
+        print(
+            f"{'workers':>8} {'pages':>6} {'failed':>6} {'pages/sec':>10} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'CPU %':>6} {'RSS MiB':>8}"
+        )
+        for workers in args.workers:
+            # The site keeps serving from this process while the crawl runs in a child one.
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "benchmark.bench_crawl",
+                "--child-url",
+                site.start_url,
+                "--workers",
+                str(workers),
+                "--max-pages",
+                str(args.max_pages),
+                stdout=asyncio.subprocess.PIPE,
+            )
+            stdout, _ = await process.communicate()
+            if process.returncode:
+                raise RuntimeError(f"The crawl with {workers} workers failed with exit code {process.returncode}")
+            result = json.loads(stdout.decode().splitlines()[-1])
+            results.append(result)
+            print(
+                f"{workers:>8} {result['pages']:>6} {result['failed']:>6.0f} {result['pages_per_sec']:>10.1f} "
+                f"{result['fetch_p50_ms']:>8.1f} {result['fetch_p99_ms']:>8.1f} {100 * result['cpu_share']:>6.0f} "
+                f"{result['peak_rss_mib']:>8.1f}"
+            )
+    finally:
+        await site.close()
+
+    if args.output:
+        run = {
+            "benchmark": "bench_crawl",
+            "timestamp": time.time(),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "site": {
+                "pages": args.pages,
+                "fan_out": args.fan_out,
+                "page_weight": args.page_weight,
+                "seed": args.seed,
+                "latency": args.latency,
+                "error_rate": args.error_rate,
+            },
+            "max_pages": args.max_pages,
+            "results": results,
+        }
+        with open(args.output, "a", encoding="utf-8") as output:
+            output.write(json.dumps(run) + "\n")
+
+
+def _commit() -> Optional[str]:
+    """
+    Get the commit the benchmark runs on, if it runs in a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark whole crawls against a local synthetic site.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--max-pages", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=1000, help="The number of pages on the site.")
+    parser.add_argument("--fan-out", type=int, default=20)
+    parser.add_argument("--page-weight", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02, help="The average response time, in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="The share of pages answered with a 500.")
+    parser.add_argument("--output", type=str, default=None, help="The JSON lines file to append the results to.")
+    parser.add_argument("--child-url", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_url:
+        # Failed fetches are expected with --error-rate, and logging them would only add noise.
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(asyncio.run(_crawl(args.child_url, args.workers[0], args.max_pages))))
+    else:
+        asyncio.run(_run(args))
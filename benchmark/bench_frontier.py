@@ -0,0 +1,64 @@
+"""
+Benchmark the frontier operations/sec under many workers, adding each page's links one at a time or in one batch.
+
+Run with: python -m benchmark.bench_frontier
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from src.service.frontier import Frontier
+
+_NETLOC = "monzo.com"
+
+
+def _links(page: int, urls: int, fan_out: int) -> set[str]:
+    rng = random.Random(page)
+    return {f"https://{_NETLOC}/page/{rng.randrange(urls)}" for _ in range(fan_out)}
+
+
+async def _bench(batched: bool, workers: int, pages: int, urls: int, fan_out: int) -> float:
+    """
+    Run workers which pop a URL, add the links of its page, and mark it done, until the pages have been processed.
+    :return: The number of frontier operations per second: URLs popped plus links added.
+    """
+    frontier = Frontier(_NETLOC)
+    await frontier.add_url(f"https://{_NETLOC}/page/0")
+    links = [_links(page, urls, fan_out) for page in range(urls)]
+    processed = 0
+
+    async def worker() -> None:
+        nonlocal processed
+        while processed < pages:
+            url = await frontier.get_next_url()
+            processed += 1
+            page_links = links[int(url.rsplit("/", 1)[1])]
+            if batched:
+                await frontier.add_urls(page_links, normalized=True)
+            else:
+                for link in page_links:
+                    await frontier.add_url(link, normalized=True)
+            frontier.task_done(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    duration = time.perf_counter() - start
+    frontier.close()
+    return processed * (1 + fan_out) / duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the frontier operations.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--urls", type=int, default=50_000)
+    parser.add_argument("--fan-out", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'per-link ops/sec':>17} {'batched ops/sec':>16} {'speedup':>8}")
+    for workers in args.workers:
+        per_link = asyncio.run(_bench(False, workers, args.pages, args.urls, args.fan_out))
+        batched = asyncio.run(_bench(True, workers, args.pages, args.urls, args.fan_out))
+        print(f"{workers:>8} {per_link:>17.0f} {batched:>16.0f} {batched / per_link:>8.1f}")
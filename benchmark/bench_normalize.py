@@ -0,0 +1,72 @@
+"""
+Benchmark resolving and normalizing the links of a page, per href as before, against the batched, memoised resolution.
+
+Run with: python -m benchmark.bench_normalize
+"""
+
+import argparse
+import random
+import time
+from urllib.parse import urljoin, urlparse
+
+from src.utils import _resolve, normalize_url, resolve_urls
+
+_ORIGIN = "https://monzo.com"
+
+
+def _link_sets(pages: int, menu_links: int, body_links: int, seed: int = 0) -> list[tuple[str, list[str]]]:
+    """
+    Generate the hrefs of blog-like pages: a menu repeated on every page, in a mix of absolute and root-relative hrefs,
+    and body links to other articles and tags, some relative to the page.
+    """
+    rng = random.Random(seed)
+    menu = [f"{_ORIGIN}/menu/{i}/" if i % 2 else f"/menu/{i}#top" for i in range(menu_links)]
+    link_sets = []
+    for page in range(pages):
+        body = [
+            rng.choice(
+                (
+                    f"/blog/{rng.randrange(pages)}",
+                    f"{_ORIGIN}/blog/{rng.randrange(pages)}/",
+                    f"../tag/{rng.randrange(50)}",
+                    f"comments?page={rng.randrange(5)}",
+                )
+            )
+            for _ in range(body_links)
+        ]
+        link_sets.append((f"{_ORIGIN}/blog/{page}/", menu + body))
+    return link_sets
+
+
+def _per_href(base_url: str, hrefs: list[str]) -> set[str]:
+    # The previous path: each href joined and normalized by the parser, then normalized again by the frontier.
+    links = {normalize_url.__wrapped__(urljoin(base_url, href)) for href in hrefs}
+    return {normalize_url.__wrapped__(link) for link in links if urlparse(link).netloc}
+
+
+def _bench(resolve, link_sets: list[tuple[str, list[str]]]) -> float:
+    start = time.perf_counter()
+    for base_url, hrefs in link_sets:
+        resolve(base_url, hrefs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark URL resolution and normalization.")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--menu-links", type=int, default=60)
+    parser.add_argument("--body-links", type=int, default=40)
+    args = parser.parse_args()
+
+    link_sets = _link_sets(args.pages, args.menu_links, args.body_links)
+    hrefs = sum(len(page_hrefs) for _, page_hrefs in link_sets)
+    for base_url, page_hrefs in link_sets:
+        assert _per_href(base_url, page_hrefs) == resolve_urls(base_url, page_hrefs)
+    _resolve.cache_clear()
+    normalize_url.cache_clear()
+
+    print(f"{'method':>10} {'hrefs/sec':>12} {'speedup':>8}")
+    baseline = _bench(_per_href, link_sets)
+    print(f"{'per-href':>10} {hrefs / baseline:>12.0f} {1:>8.1f}")
+    batched = _bench(resolve_urls, link_sets)
+    print(f"{'batched':>10} {hrefs / batched:>12.0f} {baseline / batched:>8.1f}")
@@ -0,0 +1,43 @@
+"""
+Benchmark pages/sec against a local synthetic site as the number of parser processes grows.
+
+Run with: python -m benchmark.bench_parse_pool
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmark.site import SyntheticSite
+from src.main import main
+
+
+async def _run(processes: list[int], workers: int, max_pages: int, page_weight: int) -> None:
+    site = SyntheticSite(pages=max_pages * 2, page_weight=page_weight)
+    await site.start()
+    try:
+        print(f"{'processes':>10} {'pages':>6} {'seconds':>8} {'pages/sec':>10}")
+        for process_count in processes:
+            start = time.perf_counter()
+            pages = await main(site.start_url, workers, max_pages, process_count)
+            duration = time.perf_counter() - start
+            print(f"{process_count:>10} {pages:>6} {duration:>8.2f} {pages / duration:>10.1f}")
+    finally:
+        await site.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parsing across processes.")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--max-pages", type=int, default=500)
+    parser.add_argument("--page-weight", type=int, default=200_000)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=sorted({0, 1, 2, 4, os.cpu_count() or 1}),
+        help="The parser process counts to compare. 0 parses on the event loop.",
+    )
+    args = parser.parse_args()
+    asyncio.run(_run(args.processes, args.workers, args.max_pages, args.page_weight))
@@ -0,0 +1,43 @@
+"""
+Benchmark the link extraction engines against each other on synthetic pages.
+
+Run with: python -m benchmark.bench_parser
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmark.site import SyntheticSite
+from src.service.parser import PARSERS
+
+
+def _bench(engine: str, pages: list[str]) -> tuple[float, int]:
+    parse_fn = PARSERS[engine]
+    start = time.perf_counter()
+    for html in pages:
+        parse_fn("http://127.0.0.1/", html)
+    duration = time.perf_counter() - start
+
+    # Peak memory is measured on a separate pass, as tracemalloc slows the parse down.
+    tracemalloc.start()
+    parse_fn("http://127.0.0.1/", pages[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the link extraction engines.")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--fan-out", type=int, default=100)
+    parser.add_argument("--page-weight", type=int, default=100_000)
+    args = parser.parse_args()
+
+    site = SyntheticSite(pages=args.pages, fan_out=args.fan_out, page_weight=args.page_weight)
+    pages = [site.render(page_id) for page_id in range(args.pages)]
+
+    print(f"{'engine':>10} {'pages/sec':>10} {'peak KiB/page':>14}")
+    for engine in sorted(PARSERS):
+        duration, peak = _bench(engine, pages)
+        print(f"{engine:>10} {args.pages / duration:>10.1f} {peak / 1024:>14.0f}")
@@ -0,0 +1,27 @@
+"""
+Benchmark the memory per URL and the insert rate of the seen-URL stores.
+
+Run with: python -m benchmark.bench_seen_store
+"""
+
+import argparse
+import time
+
+from src.service.seen_store import SEEN_STORES, create_seen_store
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the seen-URL stores.")
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    parser.add_argument("--false-positive-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    urls = [f"https://monzo.com/blog/{i // 100}/article-{i}" for i in range(args.urls)]
+
+    print(f"{'store':>12} {'adds/sec':>12} {'bytes/URL':>10}")
+    for kind in SEEN_STORES:
+        store = create_seen_store(kind, args.false_positive_rate)
+        start = time.perf_counter()
+        for url in urls:
+            store.add(url)
+        duration = time.perf_counter() - start
+        print(f"{kind:>12} {args.urls / duration:>12.0f} {store.bytes_per_url():>10.1f}")
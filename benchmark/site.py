@@ -0,0 +1,98 @@
+import asyncio
+import random
+from typing import Optional
+
+from aiohttp import web
+
+
+class SyntheticSite:
+    """
+    SyntheticSite serves a generated website from a local aiohttp server, so the crawler can be benchmarked offline.
+    Every page links to a fixed number of other pages and is padded with markup to give it a realistic weight.
+    Responses can be delayed to emulate a remote server, and a share of the pages can fail, always the same ones.
+    """
+
+    def __init__(
+        self,
+        pages: int = 1000,
+        fan_out: int = 20,
+        page_weight: int = 50_000,
+        seed: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+    ) -> None:
+        """
+        Initialize the SyntheticSite.
+        :param pages: The number of pages on the site.
+        :param fan_out: The number of links on each page.
+        :param page_weight: The approximate size of each page, in bytes.
+        :param seed: The seed used to generate the links, so runs are reproducible.
+        :param latency: The average time to respond, in seconds. Each response takes between half and 1.5 times as long.
+        :param error_rate: The share of pages answered with a 500 error. The home page never fails.
+        """
+        self._pages = pages
+        self._fan_out = fan_out
+        self._page_weight = page_weight
+        self._seed = seed
+        self._latency = latency
+        self._error_rate = error_rate
+        self._latency_rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+    @property
+    def start_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/"
+
+    async def start(self) -> None:
+        """
+        Start serving the site on a free local port.
+        """
+        app = web.Application()
+        app.router.add_get("/", self._handle_page)
+        app.router.add_get("/page/{page_id}", self._handle_page)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """
+        Stop serving the site.
+        """
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle_page(self, request: web.Request) -> web.Response:
+        page_id = int(request.match_info.get("page_id", 0))
+        if page_id >= self._pages:
+            raise web.HTTPNotFound()
+        if self._latency:
+            await asyncio.sleep(self._latency * self._latency_rng.uniform(0.5, 1.5))
+        if self.fails(page_id):
+            raise web.HTTPInternalServerError()
+        return web.Response(text=self.render(page_id), content_type="text/html")
+
+    def fails(self, page_id: int) -> bool:
+        """
+        Check whether a page is answered with an error.
+        :param page_id: The id of the page.
+        :return: True if it fails, on every request.
+        """
+        return page_id != 0 and random.Random(f"{self._seed}:error:{page_id}").random() < self._error_rate
+
+    def render(self, page_id: int) -> str:
+        """
+        Render the HTML of a page.
+        :param page_id: The id of the page.
+        :return: The HTML content of the page.
+        """
+        rng = random.Random(self._seed * 1_000_003 + page_id)
+        links = "".join(
+            f'<li><a href="/page/{rng.randrange(self._pages)}">Page</a></li>' for _ in range(self._fan_out)
+        )
+        # Nested markup rather than one big text node, so the parser has a realistic amount of work to do.
+        block = '<div class="card"><p><span>Lorem ipsum</span> <em>dolor</em> sit amet.</p></div>'
+        padding = block * max(0, (self._page_weight - len(links)) // len(block))
+        return f"<html><head><title>Page {page_id}</title></head><body><ul>{links}</ul>{padding}</body></html>"
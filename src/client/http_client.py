@@ -1,50 +1,185 @@
 import asyncio
 import logging
-from typing import Optional
+import os
+import time
+from typing import Callable, NamedTuple, Optional, Union
 from urllib.parse import urlparse
 
 import aiohttp
 
+from src.client.response_cache import ResponseCache
+from src.metrics import MetricsRegistry
+from src.service.scope import CrawlScope
+from src.client.tracing import ConnectionStats, TransferStats, create_trace_config
+
 logger = logging.getLogger(__name__)
 
+_CHUNK_SIZE = 64 * 1024
+# Extensions of URLs that are very unlikely to be HTML pages, worth a HEAD request before downloading them.
+_NON_HTML_EXTENSIONS = frozenset(
+    (
+        ".7z .avi .bmp .css .csv .doc .docx .exe .gif .gz .ico .jpeg .jpg .js .json .mov .mp3 .mp4 .pdf .png .ppt "
+        ".pptx .svg .tar .tgz .txt .wav .webm .webp .woff .woff2 .xls .xlsx .xml .zip"
+    ).split()
+)
+
+
+class FetchResult(NamedTuple):
+    """
+    The outcome of fetching a URL. All fields are None if the page could not be fetched.
+    """
+
+    url: Optional[str] = None  # The URL after redirects
+    content: Optional[str] = None  # The HTML content, None if the links were reused from the cache
+    links: Optional[set[str]] = None  # The cached links, if the page was not modified since the last crawl
+
+
+class ConnectionConfig(NamedTuple):
+    """
+    How the Client's connection pool is sized, and how long its connections may take.
+    """
+
+    limit: int = 100  # The maximum number of connections open at once, across all hosts
+    limit_per_host: int = 0  # The maximum number of connections open at once to a single host, 0 for no limit
+    dns_cache_ttl: int = 300  # How long resolved addresses are cached, in seconds
+    keepalive_timeout: float = 30.0  # How long an idle connection is kept open for reuse, in seconds
+    connect_timeout: float = 5.0  # The maximum time to get a connection, including the DNS lookup and handshakes
+    read_timeout: float = 10.0  # The maximum time between two reads of a response
+    total_timeout: Optional[float] = 30.0  # The maximum time for a whole request, None for no limit
+
+    @classmethod
+    def for_workers(cls, workers: int, **overrides) -> "ConnectionConfig":
+        """
+        Size the connection pool to the number of workers. Each worker has at most one request in flight, so larger
+        limits would never be used, and smaller ones would have workers waiting for a connection.
+        :param workers: The number of workers sharing the Client.
+        :param overrides: Any other settings.
+        :return: The connection config.
+        """
+        return cls(**{"limit": workers, "limit_per_host": workers, **overrides})
+
 
 class Client:
     """
     Client is responsible for making HTTP requests to fetch the content of URLs.
     It uses aiohttp for asynchronous requests and handles redirects and content type checks.
-    It ensures that only HTML content from the allowed domain is processed.
+    It ensures that only HTML content from the domains crawled is processed.
     """
 
-    def __init__(self, allowed_netloc: str) -> None:
+    def __init__(
+        self,
+        scope: Union[CrawlScope, str, None],
+        on_response: Optional[Callable[[str, Optional[int], float], None]] = None,
+        cache: Optional[ResponseCache] = None,
+        connection_config: ConnectionConfig = ConnectionConfig(),
+        max_body_bytes: int = 5 * 1024 * 1024,
+        head_precheck: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
         """
         Initialize the Client.
-        :param allowed_netloc: The netloc of the domain to crawl.
+        :param scope: The domains to crawl, or the netloc of the only one.
+        :param on_response: An optional callback, called after every request with the URL, the HTTP status (None if
+            the request failed without a response) and the latency in seconds. Used to adapt the crawl rate.
+        :param cache: An optional response cache, to skip the pages not modified since they were last crawled.
+        :param connection_config: How the connection pool is sized and timed out.
+        :param max_body_bytes: The maximum size of a page. Larger responses are aborted as soon as the cap is reached.
+        :param head_precheck: Whether to send a HEAD request first for URLs whose extension suggests non-HTML content.
+        :param metrics: An optional registry to record the fetch latencies, errors and transfer stats in.
         """
-        self._allowed_netloc = allowed_netloc
+        self._scope = CrawlScope.of(scope)
+        self._on_response = on_response
+        self._cache = cache
+        # The validators of the pages fetched, waiting for their links to be cached.
+        self._validators: dict[str, tuple[Optional[str], Optional[str]]] = {}
+        self._connection_config = connection_config
+        self._max_body_bytes = max_body_bytes
+        self._head_precheck = head_precheck
         self._session: Optional[aiohttp.ClientSession] = None
+        self.stats = ConnectionStats()
+        self.transfer_stats = TransferStats()
+        metrics = metrics or MetricsRegistry()
+        self._fetch_seconds = metrics.histogram("fetch_seconds", "The time to fetch a page, including its body.")
+        self._fetch_errors = metrics.counter("fetch_errors_total", "The fetches failed with a network or HTTP error.")
+        # The connection and transfer stats are already counted, so they are only read when the metrics are collected.
+        for stats in (self.stats, self.transfer_stats):
+            for name in vars(stats):
+                help_text = f"{type(stats).__name__}.{name}"
+                metrics.counter(f"http_{name}_total", help_text, fn=lambda s=stats, n=name: getattr(s, n))
+        if cache:
+            metrics.counter("cache_hits_total", "The pages not modified since cached.", fn=lambda: cache.hits)
+            metrics.counter("cache_misses_total", "The cached pages downloaded again.", fn=lambda: cache.misses)
+            metrics.gauge("cache_bytes", "The size of the response cache.", fn=lambda: cache.size)
 
-    async def fetch(self, url: str) -> tuple[Optional[str], Optional[str]]:
+    async def start(self) -> None:
+        """
+        Create the aiohttp session and its connection pool, so that it is ready before the first request.
+        """
+        if self._session:
+            return
+        config = self._connection_config
+        connector = aiohttp.TCPConnector(
+            limit=config.limit,
+            limit_per_host=config.limit_per_host,
+            ttl_dns_cache=config.dns_cache_ttl,
+            keepalive_timeout=config.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=config.total_timeout, connect=config.connect_timeout, sock_read=config.read_timeout
+            ),
+            headers={"User-Agent": "WebCrawler/1.0"},
+            trace_configs=[create_trace_config(self.stats)],
+        )
+
+    async def fetch(self, url: str) -> FetchResult:
         """
         Fetch the content of a URL asynchronously.
-        :param url: The URL to fetch.
-        :return: A tuple containing the URL (after redirects) and content, or None if an error occurred.
+        If the page is cached, it is only downloaded if it was modified since, otherwise its cached links are returned.
+        :param url: The normalized URL to fetch.
+        :return: The URL (after redirects) and content or cached links, or an empty result if an error occurred.
         """
+        start = time.perf_counter()
+        try:
+            return await self._fetch(url)
+        finally:
+            self._fetch_seconds.observe(time.perf_counter() - start)
+
+    async def _fetch(self, url: str) -> FetchResult:
         if not self._session:
-            self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=10),
-                headers={"User-Agent": "WebCrawler/1.0"},
-            )
+            await self.start()
+
+        if self._head_precheck and _has_non_html_extension(url) and not await self._is_html(url):
+            return FetchResult()
 
+        cached = self._cache.get(url) if self._cache else None
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        start = time.perf_counter()
+        status = None
         try:
             logger.debug(f"Fetching URL: {url}")
-            async with self._session.get(url) as response:
+            async with self._session.get(url, headers=headers) as response:
+                status = response.status
+                self._report_response(url, status, start)
                 response.raise_for_status()  # Raise an exception for HTTP errors (4xx, 5xx)
 
-                # Ensure the final URL is within the allowed domain after redirects
+                if cached and status == 304:
+                    logger.debug(f"Not modified, reusing cached links: {url}")
+                    self._cache.hits += 1
+                    self._cache.touch(url)
+                    return FetchResult(str(response.url), None, cached.links)
+
+                # Ensure the final URL is within the crawl's scope after redirects
                 final_url = str(response.url)
-                if urlparse(final_url).netloc != self._allowed_netloc:
+                if final_url not in self._scope:
                     logger.debug(f"Skipping external URL: {final_url}")
-                    return None, None
+                    return FetchResult()
 
                 # Ensure the response is HTML
                 content_type = response.headers.get("Content-Type", "")
@@ -52,14 +187,89 @@ class Client:
                     logger.debug(
                         f"Skipping non-HTML content: {final_url} ({content_type})"
                     )
-                    return None, None
+                    self.transfer_stats.non_html_skipped += 1
+                    self.transfer_stats.bytes_saved += response.content_length or 0
+                    return FetchResult()
 
-                content = await response.text()
-                return final_url, content
+                content = await self._read_body(response)
+                if content is None:
+                    return FetchResult()
+                if self._cache:
+                    self._cache.misses += 1
+                    self._validators[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return FetchResult(final_url, content)
 
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.debug(f"Failed to fetch {url}: {e}")
-            return None, None
+            self._fetch_errors.inc()
+            if status is None:
+                self._report_response(url, None, start)
+            return FetchResult()
+
+    def cache_links(self, url: str, links: set[str]) -> None:
+        """
+        Cache the links found on a page fetched by this client, along with the page's validators.
+        :param url: The normalized URL the page was fetched from.
+        :param links: The links found on the page.
+        """
+        validators = self._validators.pop(url, None)
+        if self._cache and validators and any(validators):
+            self._cache.put(url, *validators, links)
+
+    async def _is_html(self, url: str) -> bool:
+        """
+        Check with a HEAD request whether a URL is an HTML page.
+        :param url: The URL to check.
+        :return: False if the URL is known not to be HTML, True otherwise, including when the check fails.
+        """
+        self.transfer_stats.head_prechecks += 1
+        try:
+            async with self._session.head(url, allow_redirects=True) as response:
+                if response.status >= 400:
+                    return True  # Some servers don't support HEAD, let the GET decide.
+                content_type = response.headers.get("Content-Type", "")
+                if "text/html" in content_type:
+                    return True
+                logger.debug(f"Skipping non-HTML content after HEAD: {url} ({content_type})")
+                self.transfer_stats.non_html_skipped += 1
+                self.transfer_stats.bytes_saved += response.content_length or 0
+                return False
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return True
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> Optional[str]:
+        """
+        Read and decode the body of a response, aborting as soon as it goes over the size cap.
+        :param response: The response.
+        :return: The decoded body, or None if it is too large.
+        """
+        content_length = response.content_length
+        if content_length is not None and content_length > self._max_body_bytes:
+            logger.debug(f"Skipping oversized response: {response.url} ({content_length} bytes)")
+            self.transfer_stats.oversized_aborted += 1
+            self.transfer_stats.bytes_saved += content_length
+            return None
+
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+            body += chunk
+            if len(body) > self._max_body_bytes:
+                logger.debug(f"Aborting oversized response: {response.url} (over {self._max_body_bytes} bytes)")
+                self.transfer_stats.oversized_aborted += 1
+                self.transfer_stats.bytes_downloaded += len(body)
+                if content_length is not None:
+                    self.transfer_stats.bytes_saved += content_length - len(body)
+                return None
+
+        self.transfer_stats.bytes_downloaded += len(body)
+        try:
+            return body.decode(response.charset or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+    def _report_response(self, url: str, status: Optional[int], start: float) -> None:
+        if self._on_response:
+            self._on_response(url, status, time.perf_counter() - start)
 
     async def close(self) -> None:
         """
@@ -67,3 +277,12 @@ class Client:
         """
         if self._session:
             await self._session.close()
+
+
+def _has_non_html_extension(url: str) -> bool:
+    """
+    Check whether the extension of a URL's path suggests it is not an HTML page.
+    :param url: The URL.
+    :return: True if the extension is a known non-HTML one.
+    """
+    return os.path.splitext(urlparse(url).path)[1].lower() in _NON_HTML_EXTENSIONS
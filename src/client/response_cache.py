@@ -0,0 +1,129 @@
+import logging
+import sqlite3
+import time
+from typing import NamedTuple, Optional
+
+_logger = logging.getLogger(__name__)
+
+# Normalised URLs never contain a newline, so a page's links are stored as a single newline-joined string.
+_LINK_SEPARATOR = "\n"
+# When the cache is over its size, entries are evicted until it is back under this fraction of it, so eviction doesn't
+# run on every write.
+_EVICTION_TARGET = 0.9
+
+
+class CacheEntry(NamedTuple):
+    """
+    The validators and links of a page from a previous crawl.
+    """
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    links: set[str]
+
+
+class ResponseCache:
+    """
+    ResponseCache persists the validators (ETag and Last-Modified) and the links of the pages crawled, keyed by their
+    normalized URL. On a later crawl, the Client sends them back in a conditional GET, and when the page is not modified
+    the links are reused without downloading or parsing the page again.
+    The least recently used entries are evicted once the cache grows over its maximum size.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Initialize the ResponseCache.
+        :param path: The path of the cache database. It is created if it doesn't exist.
+        :param max_bytes: The maximum size of the cached entries, in bytes.
+        """
+        self._max_bytes = max_bytes
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                links TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+            """
+        )
+        (self._size,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Get the cached entry of a page.
+        :param url: The normalized URL of the page.
+        :return: The entry, or None if the page is not cached.
+        """
+        row = self._connection.execute(
+            "SELECT etag, last_modified, links FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, links = row
+        return CacheEntry(etag, last_modified, set(links.split(_LINK_SEPARATOR)) if links else set())
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], links: set[str]) -> None:
+        """
+        Cache the validators and links of a page.
+        :param url: The normalized URL of the page.
+        :param etag: The ETag header of the response.
+        :param last_modified: The Last-Modified header of the response.
+        :param links: The links found on the page.
+        """
+        joined_links = _LINK_SEPARATOR.join(links)
+        size = len(url) + len(joined_links) + len(etag or "") + len(last_modified or "")
+        with self._connection:
+            previous = self._connection.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, links, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, joined_links, size, time.time()),
+            )
+        self._size += size - (previous[0] if previous else 0)
+        if self._size > self._max_bytes:
+            self._evict()
+
+    def touch(self, url: str) -> None:
+        """
+        Mark a page as recently used, so it is evicted last.
+        :param url: The normalized URL of the page.
+        """
+        with self._connection:
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time.time(), url))
+
+    @property
+    def size(self) -> int:
+        """
+        The size of the cached entries, in bytes.
+        """
+        return self._size
+
+    def close(self) -> None:
+        """
+        Close the cache database.
+        """
+        self._connection.close()
+
+    def _evict(self) -> None:
+        target = self._max_bytes * _EVICTION_TARGET
+        evicted = 0
+        with self._connection:
+            rows = self._connection.execute("SELECT url, size FROM responses ORDER BY accessed")
+            to_delete = []
+            for url, size in rows:
+                if self._size <= target:
+                    break
+                to_delete.append((url,))
+                self._size -= size
+                evicted += 1
+            self._connection.executemany("DELETE FROM responses WHERE url = ?", to_delete)
+        _logger.debug(f"Evicted {evicted} entries from the response cache.")
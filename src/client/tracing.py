@@ -0,0 +1,107 @@
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+
+class ConnectionStats:
+    """
+    ConnectionStats records how the Client's connections are used: how many were opened or reused, and the time spent
+    resolving hosts, opening connections and waiting for the first byte of each response.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.dns_lookups = 0
+        self.dns_cache_hits = 0
+        self.dns_seconds = 0.0
+        self.connect_seconds = 0.0
+        self.first_byte_seconds = 0.0
+
+    def summary(self) -> dict[str, float]:
+        """
+        Summarise the stats, with the times averaged per lookup, connection or request.
+        :return: The stats by name.
+        """
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "dns_lookups": self.dns_lookups,
+            "dns_cache_hits": self.dns_cache_hits,
+            "avg_dns_ms": 1000 * self.dns_seconds / self.dns_lookups if self.dns_lookups else 0.0,
+            "avg_connect_ms": (
+                1000 * self.connect_seconds / self.connections_opened if self.connections_opened else 0.0
+            ),
+            "avg_first_byte_ms": 1000 * self.first_byte_seconds / self.requests if self.requests else 0.0,
+        }
+
+
+class TransferStats:
+    """
+    TransferStats records how many bytes the Client downloaded, and how many it saved by aborting responses early:
+    non-HTML content, responses over the size cap, and URLs ruled out by a HEAD request.
+    """
+
+    def __init__(self) -> None:
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.non_html_skipped = 0
+        self.oversized_aborted = 0
+        self.head_prechecks = 0
+
+    def summary(self) -> dict[str, int]:
+        """
+        Summarise the stats.
+        :return: The stats by name.
+        """
+        return dict(vars(self))
+
+
+def create_trace_config(stats: ConnectionStats) -> aiohttp.TraceConfig:
+    """
+    Create an aiohttp trace config which records the session's connection usage and timings.
+    :param stats: The stats to record into.
+    :return: The trace config, to pass to the session.
+    """
+
+    async def on_request_start(_, context: SimpleNamespace, __) -> None:
+        context.request_start = time.perf_counter()
+
+    async def on_request_end(_, context: SimpleNamespace, __) -> None:
+        # The request ends when the response headers arrive, i.e. on the first byte of the response.
+        stats.requests += 1
+        stats.first_byte_seconds += time.perf_counter() - context.request_start
+
+    async def on_connection_create_start(_, context: SimpleNamespace, __) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(_, context: SimpleNamespace, __) -> None:
+        stats.connections_opened += 1
+        stats.connect_seconds += time.perf_counter() - context.connect_start
+
+    async def on_connection_reuseconn(*_) -> None:
+        stats.connections_reused += 1
+
+    async def on_dns_resolvehost_start(_, context: SimpleNamespace, __) -> None:
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(_, context: SimpleNamespace, __) -> None:
+        stats.dns_lookups += 1
+        stats.dns_seconds += time.perf_counter() - context.dns_start
+
+    async def on_dns_cache_hit(*_) -> None:
+        stats.dns_cache_hits += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+    return trace_config
@@ -1,54 +1,221 @@
 import argparse
 import asyncio
+import json
 import logging
 import time
-from urllib.parse import urlparse
+from typing import Optional, Union
 
-from src.client.http_client import Client
+from src.client.http_client import Client, ConnectionConfig
+from src.client.response_cache import ResponseCache
+from src.metrics import MetricsRegistry, MetricsServer
+from src.service.checkpoint import Checkpoint
 from src.service.crawler import Crawler
 from src.service.frontier import Frontier
+from src.service.page_budget import PageBudget
+from src.service.parse_pool import ParsePool
+from src.service.parser import PARSERS
+from src.service.politeness import PolitenessScheduler
 from src.service.reporter import Reporter
+from src.service.scope import CrawlScope, DomainRules
+from src.service.seen_store import SEEN_STORES, create_seen_store
+from src.service.sinks import SINK_FORMATS, create_sink
 
 _DEFAULT_LOG_LEVEL = logging.DEBUG
 
 _logger = logging.getLogger(__name__)
 
 
-async def main(start_url: str, num_workers: int, max_pages: int) -> None:
+async def main(
+    start_url: Union[str, list[str]],
+    num_workers: int,
+    max_pages: int,
+    parse_processes: int = 0,
+    parser_engine: str = "bs4",
+    min_delay: float = 0.0,
+    max_host_concurrency: Optional[int] = None,
+    seen_store: str = "exact",
+    seen_false_positive_rate: float = 0.01,
+    max_queue_in_memory: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_interval: float = 30.0,
+    resume: bool = False,
+    cache_path: Optional[str] = None,
+    cache_max_bytes: int = 256 * 1024 * 1024,
+    connection_config: Optional[ConnectionConfig] = None,
+    max_body_bytes: int = 5 * 1024 * 1024,
+    head_precheck: bool = False,
+    output_format: str = "console",
+    output_path: str = "-",
+    graph_path: Optional[str] = None,
+    progress_interval: float = 10.0,
+    metrics_json_path: Optional[str] = None,
+    metrics_port: Optional[int] = None,
+) -> int:
     _logger.info(f"Starting the crawler with {num_workers} workers...")
     start_time = time.perf_counter()
 
+    # Parsing is CPU-bound, so it can optionally be moved off the event loop onto a pool of processes.
+    parse_fn = PARSERS[parser_engine]
+    parse_pool: Optional[ParsePool] = None
+    if parse_processes > 0:
+        parse_pool = ParsePool(parse_processes, parse_fn)
+        await parse_pool.start()
+
     # Initialize the components
-    base_netloc = urlparse(start_url).netloc
-    frontier = Frontier(base_netloc)
-    # We add the start URL to the frontier to kick off the crawling process.
-    await frontier.add_url(start_url)
-    reporter = Reporter(max_pages)
-    client = Client(base_netloc)
+    # The components record what they do in the metrics registry, which is reported as the crawl runs and at the end.
+    metrics = MetricsRegistry()
+    # Each seed is a start URL, optionally followed by the rules of its domain. Only the seeds' domains are crawled.
+    seeds = [DomainRules.from_seed(line) for line in ([start_url] if isinstance(start_url, str) else start_url)]
+    scope = CrawlScope(rules for _, rules in seeds)
+    # The scheduler adapts how many requests each host is sent at once, up to one per worker by default.
+    scheduler = PolitenessScheduler(min_delay=min_delay, max_concurrency=max_host_concurrency or num_workers)
+    visited = create_seen_store(seen_store, seen_false_positive_rate)
+    metrics.gauge("seen_store_bytes", "The memory used by the seen URLs.", fn=visited.memory_bytes)
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    frontier = Frontier(
+        scope,
+        scheduler=scheduler,
+        visited=visited,
+        max_in_memory=max_queue_in_memory,
+        checkpoint=checkpoint,
+        metrics=metrics,
+    )
+    # Results are streamed to the sink as they are recorded, rather than kept in memory until the end.
+    sink = create_sink(output_format, output_path, append=resume)
+    reporter = Reporter(max_pages, checkpoint, sink, keep_graph=graph_path is not None)
+    if resume and checkpoint:
+        # Pick up where the last checkpoint left off: pages already recorded are not fetched again.
+        frontier.restore(checkpoint)
+        reporter.restore(checkpoint)
+    # We add the start URLs to the frontier to kick off the crawling process. They are ignored if already seen.
+    await frontier.add_urls(url for url, _ in seeds)
+    cache = ResponseCache(cache_path, cache_max_bytes) if cache_path else None
+    client = Client(
+        scope,
+        on_response=frontier.record_response,
+        cache=cache,
+        connection_config=connection_config or ConnectionConfig.for_workers(num_workers),
+        max_body_bytes=max_body_bytes,
+        head_precheck=head_precheck,
+        metrics=metrics,
+    )
+    # Open the connection pool before the workers start, rather than on the first request.
+    await client.start()
 
-    # Create a shared event to signal when max number of pages is reached.
-    # This is a coroutine-safe way to warn all workers to stop crawling when the limit is reached.
-    max_pages_reached = asyncio.Event()
+    # Create a page budget shared by all workers. Each worker reserves a slot before fetching a page, so exactly
+    # max_pages pages are fetched. Pages restored from a checkpoint have already used their slot.
+    budget = PageBudget(max_pages, used=reporter.count)
 
     # We create the workers, each of which will run an instance of the Crawler class.
     tasks = [
-        asyncio.create_task(
-            Crawler(i + 1, frontier, client, reporter, max_pages_reached, max_pages).run()
-        )
+        asyncio.create_task(Crawler(i + 1, frontier, client, reporter, budget, parse_pool, parse_fn, metrics).run())
         for i in range(num_workers)
     ]
 
-    await asyncio.gather(*tasks)
+    checkpoint_task = asyncio.create_task(checkpoint.run(checkpoint_interval)) if checkpoint else None
+    progress_task = (
+        asyncio.create_task(_log_progress(metrics, progress_interval, start_time)) if progress_interval > 0 else None
+    )
+    metrics_server = MetricsServer(metrics, metrics_port) if metrics_port is not None else None
+    if metrics_server:
+        await metrics_server.start()
+
+    await _run_workers(tasks, budget)
+    await reporter.close()
+    if progress_task:
+        progress_task.cancel()
+
+    if checkpoint:
+        checkpoint_task.cancel()
+        await checkpoint.save()
+        checkpoint.close()
 
     end_time = time.perf_counter()
     duration = end_time - start_time
 
     # Log the results
-    reporter.output()
-    _logger.info(f"Crawled {len(reporter.results)} pages in {duration:.2f} seconds")
+    _logger.info(f"Crawled {reporter.count} pages in {duration:.2f} seconds")
+    _logger.info(
+        f"Seen {len(visited)} URLs using {visited.memory_bytes()} bytes ({visited.bytes_per_url():.1f} bytes/URL)"
+    )
+
+    _logger.info(f"Connections: {client.stats.summary()}")
+    _logger.info(f"Transfers: {client.transfer_stats.summary()}")
+    if reporter.graph is not None:
+        graph = reporter.graph
+        _logger.info(
+            f"Link graph: {graph.node_count} URLs, {graph.edge_count} links using {graph.memory_bytes()} bytes, "
+            f"{len(graph.orphans())} orphan pages"
+        )
+        _logger.info(f"Most linked: {graph.top_linked(5)}")
+        if graph_path:
+            # Binary files can be read back with LinkGraph.load, anything else is written as a text edge list.
+            if graph_path.endswith(".bin"):
+                graph.export_binary(graph_path)
+            else:
+                graph.export_edge_list(graph_path)
+    if cache:
+        _logger.info(f"Response cache: {cache.hits} hits, {cache.misses} misses, {cache.size} bytes")
+
+    summary = json.dumps({"pages": reporter.count, "duration_seconds": duration, **metrics.snapshot()})
+    _logger.info(f"Metrics: {summary}")
+    if metrics_json_path:
+        with open(metrics_json_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(summary + "\n")
 
     # We close the client after all tasks are done to ensure all connections are closed properly.
     await client.close()
+    if cache:
+        cache.close()
+    frontier.close()
+    if parse_pool:
+        await parse_pool.close()
+    if metrics_server:
+        await metrics_server.close()
+
+    return reporter.count
+
+
+async def _log_progress(metrics: MetricsRegistry, interval: float, start_time: float) -> None:
+    """
+    Log the crawl's progress periodically.
+    :param metrics: The crawl's metrics.
+    :param interval: The time between two progress lines, in seconds.
+    :param start_time: When the crawl started, on the perf_counter clock.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        pages = metrics.value("pages_crawled_total")
+        fetch_seconds = metrics.get("fetch_seconds")
+        parse_seconds = metrics.get("parse_seconds")
+        _logger.info(
+            f"Progress: {pages:.0f} pages ({pages / (time.perf_counter() - start_time):.1f}/s), "
+            f"{metrics.value('queue_depth'):.0f} queued, {metrics.value('urls_in_flight'):.0f} in flight, "
+            f"fetch p50/p99 {1000 * fetch_seconds.quantile(0.5):.0f}/{1000 * fetch_seconds.quantile(0.99):.0f} ms, "
+            f"parse p50 {1000 * parse_seconds.quantile(0.5):.1f} ms, "
+            f"dedupe hit rate {metrics.value('dedupe_hit_rate'):.0%}, "
+            f"{metrics.value('http_bytes_downloaded_total') / 1024 / 1024:.1f} MiB downloaded, "
+            f"{metrics.value('worker_idle_seconds_total'):.1f}s worker idle time"
+        )
+
+
+async def _run_workers(tasks: list[asyncio.Task], budget: PageBudget) -> None:
+    """
+    Wait for the workers to finish, cancelling them as soon as the page budget is used up, rather than leaving them
+    waiting on an empty queue.
+    :param tasks: The worker tasks.
+    :param budget: The page budget shared by the workers.
+    """
+    workers = asyncio.gather(*tasks)
+    exhausted = asyncio.create_task(budget.exhausted.wait())
+    await asyncio.wait({workers, exhausted}, return_when=asyncio.FIRST_COMPLETED)
+    exhausted.cancel()
+    if not workers.done():
+        # Once the budget is used up no fetch is in flight, so cancelling only interrupts workers waiting for a URL.
+        workers.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    elif workers.exception():
+        raise workers.exception()
 
 
 if __name__ == "__main__":
@@ -66,6 +233,14 @@ if __name__ == "__main__":
         help="The URL to start crawling from. Defaults to https://monzo.com.",
     )
 
+    parser.add_argument(
+        "--seeds",
+        type=str,
+        default=None,
+        help="A file listing the start URLs of many domains to crawl, one per line with the domain's rules. "
+        "Overrides --start-url.",
+    )
+
     parser.add_argument(
         "--workers",
         type=int,
@@ -80,7 +255,221 @@ if __name__ == "__main__":
         help="The maximum pages to crawl. Defaults to 10.",
     )
 
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=0,
+        help="The number of processes to parse pages in. Defaults to 0, which parses on the event loop.",
+    )
+
+    parser.add_argument(
+        "--parser",
+        choices=sorted(PARSERS),
+        default="bs4",
+        help="The link extraction engine. Defaults to bs4.",
+    )
+
+    parser.add_argument(
+        "--min-delay",
+        type=float,
+        default=0.0,
+        help="The minimum delay between two requests to the same host, in seconds. Defaults to 0.",
+    )
+
+    parser.add_argument(
+        "--max-host-concurrency",
+        type=int,
+        default=None,
+        help="The maximum number of concurrent requests to a host. Defaults to the number of workers.",
+    )
+
+    parser.add_argument(
+        "--seen-store",
+        choices=SEEN_STORES,
+        default="exact",
+        help="How seen URLs are stored: exact URLs, 64-bit fingerprints or a bloom filter. Defaults to exact.",
+    )
+
+    parser.add_argument(
+        "--seen-false-positive-rate",
+        type=float,
+        default=0.01,
+        help="The false positive rate of the bloom seen-URL store. Defaults to 0.01.",
+    )
+
+    parser.add_argument(
+        "--max-queue-in-memory",
+        type=int,
+        default=None,
+        help="The maximum number of queued URLs kept in memory, the rest is spilled to disk. Defaults to no limit.",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="The file to periodically save the crawl's progress to. Defaults to no checkpoints.",
+    )
+
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=30.0,
+        help="The time between two checkpoints, in seconds. Defaults to 30.",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the crawl from the last checkpoint, without fetching the pages already done.",
+    )
+
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="The file to cache responses in, to skip unmodified pages on later crawls. Defaults to no cache.",
+    )
+
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=256 * 1024 * 1024,
+        help="The maximum size of the response cache, in bytes. Defaults to 256 MiB.",
+    )
+
+    parser.add_argument(
+        "--limit-per-host",
+        type=int,
+        default=None,
+        help="The maximum number of connections open to a host. Defaults to the number of workers.",
+    )
+
+    parser.add_argument(
+        "--dns-cache-ttl",
+        type=int,
+        default=300,
+        help="How long resolved host addresses are cached, in seconds. Defaults to 300.",
+    )
+
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=30.0,
+        help="How long an idle connection is kept open for reuse, in seconds. Defaults to 30.",
+    )
+
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=5.0,
+        help="The maximum time to open a connection, in seconds. Defaults to 5.",
+    )
+
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=10.0,
+        help="The maximum time between two reads of a response, in seconds. Defaults to 10.",
+    )
+
+    parser.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=5 * 1024 * 1024,
+        help="The maximum size of a page, in bytes. Larger responses are aborted. Defaults to 5 MiB.",
+    )
+
+    parser.add_argument(
+        "--head-precheck",
+        action="store_true",
+        help="Send a HEAD request first for URLs whose extension suggests they are not HTML.",
+    )
+
+    parser.add_argument(
+        "--output-format",
+        choices=SINK_FORMATS,
+        default="console",
+        help="How the results are written: logged to the console, or as JSON lines or CSV. Defaults to console.",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="-",
+        help="The file to write the results to, compressed if it ends with .gz. Defaults to stdout.",
+    )
+
+    parser.add_argument(
+        "--graph",
+        type=str,
+        default=None,
+        help="Export the link graph to this file: binary if it ends with .bin, a text edge list otherwise.",
+    )
+
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=10.0,
+        help="The time between two progress lines, in seconds, 0 for none. Defaults to 10.",
+    )
+
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        default=None,
+        help="Write the final metrics summary to this JSON file.",
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve the metrics in the Prometheus text format on this local port, on /metrics.",
+    )
+
     args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+
+    start_urls = args.start_url
+    if args.seeds:
+        with open(args.seeds, encoding="utf-8") as seeds_file:
+            start_urls = [line.strip() for line in seeds_file if line.strip() and not line.startswith("#")]
 
     # Run the crawler
-    asyncio.run(main(args.start_url, args.workers, args.max_pages))
+    asyncio.run(
+        main(
+            start_urls,
+            args.workers,
+            args.max_pages,
+            args.parse_processes,
+            args.parser,
+            args.min_delay,
+            args.max_host_concurrency,
+            args.seen_store,
+            args.seen_false_positive_rate,
+            args.max_queue_in_memory,
+            args.checkpoint,
+            args.checkpoint_interval,
+            args.resume,
+            args.cache,
+            args.cache_max_bytes,
+            ConnectionConfig.for_workers(
+                args.workers,
+                limit_per_host=args.limit_per_host or args.workers,
+                dns_cache_ttl=args.dns_cache_ttl,
+                keepalive_timeout=args.keepalive_timeout,
+                connect_timeout=args.connect_timeout,
+                read_timeout=args.read_timeout,
+            ),
+            args.max_body_bytes,
+            args.head_precheck,
+            args.output_format,
+            args.output,
+            args.graph,
+            args.progress_interval,
+            args.metrics_json,
+            args.metrics_port,
+        )
+    )
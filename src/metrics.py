@@ -0,0 +1,302 @@
+import logging
+import math
+from bisect import bisect_left
+from typing import Callable, Optional, Union
+
+from aiohttp import web
+
+_logger = logging.getLogger(__name__)
+
+# The upper bounds of the default histogram buckets, in seconds: from a millisecond to a minute.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Counter:
+    """
+    A value that only goes up, e.g. the number of pages crawled.
+    """
+
+    __slots__ = ("value",)
+    kind = "counter"
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def get(self) -> float:
+        return self.value
+
+
+class Gauge:
+    """
+    A value that goes up and down, e.g. the queue depth. It is either set, or read from a function when collected, so
+    that values already tracked elsewhere cost nothing on the hot path.
+    """
+
+    __slots__ = ("value", "_fn", "kind")
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None, kind: str = "gauge") -> None:
+        """
+        Initialize the Gauge.
+        :param fn: An optional function returning the value.
+        :param kind: The type the value is exposed as, "counter" if it only goes up.
+        """
+        self.value = 0.0
+        self._fn = fn
+        self.kind = kind
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def get(self) -> float:
+        return self._fn() if self._fn else self.value
+
+
+class Histogram:
+    """
+    A distribution of values, e.g. fetch latencies, counted in fixed buckets. Observing a value is a binary search and
+    an increment, and quantiles are estimated from the buckets.
+    """
+
+    __slots__ = ("_bounds", "_counts", "count", "sum")
+    kind = "histogram"
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """
+        Initialize the Histogram.
+        :param buckets: The upper bounds of the buckets, in increasing order. A last, unbounded bucket is added.
+        """
+        self._bounds = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile, interpolating linearly within its bucket.
+        :param q: The quantile, between 0 and 1.
+        :return: The estimated value, or 0 if nothing was observed.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self._bounds[index - 1] if index else 0.0
+                if index == len(self._bounds):
+                    return lower  # The unbounded bucket has no upper bound to interpolate to.
+                return lower + (self._bounds[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self._bounds[-1]
+
+    def buckets(self) -> list[tuple[float, int]]:
+        """
+        Get the cumulative count of each bucket.
+        :return: The upper bound and cumulative count of each bucket, ending with the unbounded one.
+        """
+        cumulative = 0
+        buckets = []
+        for bound, bucket_count in zip((*self._bounds, math.inf), self._counts):
+            cumulative += bucket_count
+            buckets.append((bound, cumulative))
+        return buckets
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricsRegistry:
+    """
+    MetricsRegistry holds the crawl's metrics, so they can be reported together.
+    Components get their metrics from it once, when they are created, and then update them directly: a counter
+    increment or a histogram observation is all the instrumentation costs on the hot path.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, dict[Labels, Metric]] = {}
+        self._help: dict[str, str] = {}
+
+    def counter(
+        self,
+        name: str,
+        help_text: str,
+        labels: Optional[dict[str, str]] = None,
+        fn: Optional[Callable[[], float]] = None,
+    ) -> Union[Counter, Gauge]:
+        """
+        Get or create a counter.
+        :param name: The name of the counter, ending with _total.
+        :param help_text: What the counter counts.
+        :param labels: Optional labels, e.g. {"worker": "1"}, making it one of a family of counters.
+        :param fn: An optional function to read the value from, for values already counted elsewhere.
+        :return: The counter.
+        """
+        return self._get(name, help_text, labels, lambda: Gauge(fn, "counter") if fn else Counter())
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str,
+        labels: Optional[dict[str, str]] = None,
+        fn: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        """
+        Get or create a gauge.
+        :param name: The name of the gauge.
+        :param help_text: What the gauge measures.
+        :param labels: Optional labels, making it one of a family of gauges.
+        :param fn: An optional function to read the value from when the metrics are collected.
+        :return: The gauge.
+        """
+        return self._get(name, help_text, labels, lambda: Gauge(fn))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Optional[dict[str, str]] = None,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """
+        Get or create a histogram.
+        :param name: The name of the histogram, ending with its unit, e.g. _seconds.
+        :param help_text: What the histogram measures.
+        :param labels: Optional labels, making it one of a family of histograms.
+        :param buckets: The upper bounds of the buckets.
+        :return: The histogram.
+        """
+        return self._get(name, help_text, labels, lambda: Histogram(buckets))
+
+    def get(self, name: str, labels: Optional[dict[str, str]] = None) -> Optional[Metric]:
+        """
+        Get a metric by name and labels.
+        :return: The metric, or None if there is none.
+        """
+        return self._metrics.get(name, {}).get(_labels(labels))
+
+    def value(self, name: str) -> float:
+        """
+        Get the value of a counter or gauge, summed over its labels.
+        :param name: The name of the metric.
+        :return: The value, or 0 if there is no such metric.
+        """
+        return sum(metric.get() for metric in self._metrics.get(name, {}).values())
+
+    def snapshot(self) -> dict[str, object]:
+        """
+        Collect the metrics into a JSON-serialisable dictionary. Histograms are summarised with their count, mean and
+        quantiles, and labelled metrics are nested by label values.
+        :return: The metrics by name.
+        """
+        snapshot: dict[str, object] = {}
+        for name, family in self._metrics.items():
+            values = {
+                ",".join(value for _, value in labels): (
+                    metric.summary() if isinstance(metric, Histogram) else metric.get()
+                )
+                for labels, metric in family.items()
+            }
+            snapshot[name] = values.pop("") if list(values) == [""] else values
+        return snapshot
+
+    def render_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        :return: The metrics, one sample per line.
+        """
+        lines = []
+        for name, family in self._metrics.items():
+            kind = next(iter(family.values())).kind
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in family.items():
+                if isinstance(metric, Histogram):
+                    for bound, cumulative in metric.buckets():
+                        le = "+Inf" if bound == math.inf else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {metric.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {metric.get()}")
+        return "\n".join(lines) + "\n"
+
+    def _get(self, name: str, help_text: str, labels: Optional[dict[str, str]], create: Callable[[], Metric]):
+        family = self._metrics.setdefault(name, {})
+        self._help.setdefault(name, help_text)
+        key = _labels(labels)
+        metric = family.get(key)
+        if metric is None:
+            metric = family[key] = create()
+        return metric
+
+
+class MetricsServer:
+    """
+    MetricsServer exposes a registry on a local HTTP endpoint, in the Prometheus text format, so a crawl can be scraped
+    or watched with curl while it runs.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 0, host: str = "127.0.0.1") -> None:
+        """
+        Initialize the MetricsServer.
+        :param registry: The metrics to expose.
+        :param port: The port to listen on, 0 for a free one.
+        :param host: The address to listen on. Defaults to local connections only.
+        """
+        self._registry = registry
+        self._host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        """
+        Start serving the metrics on /metrics.
+        """
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        _logger.info(f"Serving metrics on http://{self._host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        """
+        Stop serving the metrics.
+        """
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle_metrics(self, _: web.Request) -> web.Response:
+        return web.Response(text=self._registry.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+
+def _labels(labels: Optional[dict[str, str]]) -> Labels:
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import sqlite3
+from typing import Iterator
+
+_logger = logging.getLogger(__name__)
+
+# Normalised URLs never contain a newline, so a page's links are stored as a single newline-joined string.
+_LINK_SEPARATOR = "\n"
+
+
+class Checkpoint:
+    """
+    Checkpoint saves the progress of a crawl to a SQLite database, so that it can be resumed if the process dies.
+    It records every URL the frontier has seen, and the links of every page the reporter has recorded. The URLs still
+    to crawl are the seen ones without a recorded page, so the queue itself never needs to be saved.
+    Changes are buffered in memory and written incrementally on a background thread, so the workers are only paused
+    for as long as it takes to swap the buffers.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the Checkpoint.
+        :param path: The path of the database. It is created if it doesn't exist.
+        """
+        self._path = path
+        self._seen: list[tuple[str, int]] = []
+        self._results: list[tuple[str, str]] = []
+        self._lock = asyncio.Lock()
+        # Writes happen on a worker thread, one at a time, so the connection is shared across threads.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY, priority INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS results (url TEXT PRIMARY KEY, links TEXT NOT NULL);
+            """
+        )
+
+    def note_seen(self, url: str, priority: int) -> None:
+        """
+        Record that the frontier has queued a URL.
+        :param url: The normalized URL.
+        :param priority: The priority it was queued with.
+        """
+        self._seen.append((url, priority))
+
+    def note_result(self, url: str, links: set[str]) -> None:
+        """
+        Record the links found on a page, which marks it as done.
+        :param url: The URL of the page.
+        :param links: The links found on the page.
+        """
+        self._results.append((url, _LINK_SEPARATOR.join(links)))
+
+    async def save(self) -> None:
+        """
+        Write the changes recorded since the last save.
+        """
+        async with self._lock:
+            seen, self._seen = self._seen, []
+            results, self._results = self._results, []
+            if seen or results:
+                await asyncio.to_thread(self._write, seen, results)
+                _logger.debug(f"Checkpointed {len(seen)} seen URLs and {len(results)} results.")
+
+    async def run(self, interval: float) -> None:
+        """
+        Save periodically, until cancelled.
+        :param interval: The time between two saves, in seconds.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.save()
+
+    def pending(self) -> Iterator[tuple[str, int]]:
+        """
+        Get the URLs that were seen but whose page was not recorded, i.e. the URLs still to crawl.
+        :return: The URLs and their priority.
+        """
+        return self._connection.execute(
+            "SELECT seen.url, seen.priority FROM seen LEFT JOIN results ON seen.url = results.url "
+            "WHERE results.url IS NULL"
+        )
+
+    def seen(self) -> Iterator[str]:
+        """
+        Get all the URLs seen by the frontier.
+        """
+        return (url for (url,) in self._connection.execute("SELECT url FROM seen"))
+
+    def results(self) -> Iterator[tuple[str, set[str]]]:
+        """
+        Get the recorded pages and their links.
+        """
+        return (
+            (url, set(links.split(_LINK_SEPARATOR)) if links else set())
+            for url, links in self._connection.execute("SELECT url, links FROM results")
+        )
+
+    def close(self) -> None:
+        """
+        Close the database. Changes not saved yet are lost.
+        """
+        self._connection.close()
+
+    def _write(self, seen: list[tuple[str, int]], results: list[tuple[str, str]]) -> None:
+        with self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO seen (url, priority) VALUES (?, ?)", seen)
+            self._connection.executemany("INSERT OR REPLACE INTO results (url, links) VALUES (?, ?)", results)
@@ -1,8 +1,12 @@
-import asyncio
 import logging
+import time
+from typing import Callable, Optional
 
 from src.client.http_client import Client
+from src.metrics import MetricsRegistry
 from src.service.frontier import Frontier
+from src.service.page_budget import PageBudget
+from src.service.parse_pool import ParsePool
 from src.service.parser import parse
 from src.service.reporter import Reporter
 
@@ -23,48 +27,96 @@ class Crawler:
             frontier: Frontier,
             client: Client,
             reporter: Reporter,
-            max_pages_reached: asyncio.Event,
-            max_pages: int,
+            budget: PageBudget,
+            parse_pool: Optional[ParsePool] = None,
+            parse_fn: Callable[[str, str], set[str]] = parse,
+            metrics: Optional[MetricsRegistry] = None,
     ) -> None:
         self._id = worker_id
         self._frontier = frontier
         self._client = client
         self._reporter = reporter
-        self._max_pages = max_pages
-        self._max_pages_reached = max_pages_reached
+        self._budget = budget
+        self._parse_pool = parse_pool
+        self._parse_fn = parse_fn
+        metrics = metrics or MetricsRegistry()
+        self._idle_seconds = metrics.counter(
+            "worker_idle_seconds_total",
+            "The time spent waiting for a URL or a budget slot.",
+            {"worker": str(worker_id)},
+        )
+        self._parse_seconds = metrics.histogram("parse_seconds", "The time to extract the links of a page.")
+        self._pages_crawled = metrics.counter("pages_crawled_total", "The pages crawled.")
+        self._pages_failed = metrics.counter("pages_failed_total", "The pages which could not be fetched.")
+        self._links_found = metrics.counter("links_found_total", "The links found on the pages crawled.")
 
     async def run(self) -> None:
         """
         Run the crawler to fetch and parse URLs.
         :return: None
         """
-        while not self._max_pages_reached.is_set():
-            url = await self._frontier.get_next_url()
-            if not url:
-                _logger.debug(f"Queue is empty. Stopping the crawler worker with id={self._id}.")
-                break
+        # A slot of the page budget is reserved before each fetch, so no worker ever fetches a page over the budget.
+        idle_since = time.perf_counter()
+        while await self._budget.reserve():
+            crawled = False
+            try:
+                url = await self._frontier.get_next_url()
+                self._idle_seconds.inc(time.perf_counter() - idle_since)
+                if not url:
+                    _logger.debug(f"Queue is empty. Stopping the crawler worker with id={self._id}.")
+                    break
 
-            if self._is_max_pages_reached():
-                self._max_pages_reached.set()
-                _logger.debug(f"Max number of pages reached. Stopping the crawler worker with id={self._id}.")
-                break
+                try:
+                    crawled = await self._crawl(url)
+                finally:
+                    # Free the host's slot in the frontier, whether the page was crawled or not.
+                    self._frontier.task_done(url, crawled)
+            finally:
+                if crawled:
+                    self._budget.commit()
+                else:
+                    self._budget.release()
+                idle_since = time.perf_counter()
 
-            final_url, content = await self._client.fetch(url)
-            if not content:
-                _logger.error(f"Failed to fetch content from {url}.")
-                continue
-            links = parse(final_url, content)
+        _logger.info(f"Stopping the crawler worker with id={self._id}.")
 
-            self._reporter.record(url, links)
+    async def _crawl(self, url: str) -> bool:
+        """
+        Fetch and parse a page, record its links and add them to the frontier.
+        :param url: The URL of the page.
+        :return: True if the page was crawled, False if it could not be fetched.
+        """
+        result = await self._client.fetch(url)
+        if result.links is not None:
+            # The page was not modified since it was last crawled, so its links are already known.
+            links = result.links
+        elif result.content:
+            links = await self._parse(result.url, result.content)
+            self._client.cache_links(url, links)
+        else:
+            _logger.error(f"Failed to fetch content from {url}.")
+            self._pages_failed.inc()
+            return False
 
-            for link in links:
-                await self._frontier.add_url(link)
+        self._pages_crawled.inc()
+        self._links_found.inc(len(links))
+        await self._reporter.record(url, links)
 
-        _logger.info(f"Stopping the crawler worker with id={self._id}.")
+        # The parser's links, like the cached ones, are already normalized.
+        await self._frontier.add_urls(links, normalized=True)
+        return True
 
-    def _is_max_pages_reached(self) -> bool:
+    async def _parse(self, base_url: str, html: str) -> set[str]:
         """
-        Check if the maximum number of pages has been reached.
-        :return: True if max pages reached, False otherwise.
+        Extract the links of a page, in a parser process if a pool is configured, or on the event loop otherwise.
+        :param base_url: The URL of the page being parsed.
+        :param html: The HTML content of the page.
+        :return: A set of normalized, absolute URLs.
         """
-        return len(self._reporter.results) >= self._max_pages
+        start = time.perf_counter()
+        try:
+            if self._parse_pool:
+                return await self._parse_pool.parse(base_url, html)
+            return self._parse_fn(base_url, html)
+        finally:
+            self._parse_seconds.observe(time.perf_counter() - start)
@@ -1,42 +1,353 @@
 import asyncio
+import heapq
+import itertools
 import logging
-from typing import Optional
-from urllib.parse import urlparse
+import math
+from typing import Iterable, Optional, Union
 
-from src.utils import normalize_url
+from src.metrics import MetricsRegistry
+from src.service.checkpoint import Checkpoint
+from src.service.politeness import PolitenessScheduler
+from src.service.scope import CrawlScope, DomainRules
+from src.service.seen_store import ExactSeenStore, SeenUrlStore
+from src.service.spill_queue import QueueEntry, SpillQueue
+from src.utils import normalize_url, url_netloc
 
 _logger = logging.getLogger(__name__)
 
+# The maximum number of URLs paged back in from the spill queue at once.
+_REFILL_BATCH_SIZE = 1000
+
+
+class _DomainState:
+    """
+    The progress of the crawl of a single domain.
+    """
+
+    __slots__ = ("rules", "hosts", "crawled", "failed", "in_flight", "done")
+
+    def __init__(self, rules: DomainRules) -> None:
+        self.rules = rules
+        self.hosts: set[str] = set()
+        self.crawled = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.done = False  # Whether it reached its page limit
+
+    def at_limit(self) -> bool:
+        """
+        Check whether the pages crawled and in flight reach the domain's page limit, so no more may be dispatched.
+        """
+        return self.rules.max_pages is not None and self.crawled + self.in_flight >= self.rules.max_pages
+
 
 class Frontier:
     """
     Frontier is responsible for managing the URLs to be crawled.
-    It maintains a queue of URLs and ensures that only valid URLs are added.
-    It also keeps track of visited URLs to avoid duplicates.
+    It maintains a queue of URLs per host and ensures that only URLs in the crawl's scope, which may span many domains,
+    are added. It also keeps track of visited URLs to avoid duplicates.
+    A PolitenessScheduler decides when each host may be crawled next, so that a host is never sent more requests than
+    it can handle. The ready hosts take turns, so that a host with a long queue, or a slow one, never starves the
+    others. Each domain can have its own page limit and concurrency limit, and its own stats.
+    Optionally, only a bounded window of URLs is kept in memory, and the overflow is spilled to disk, so that memory
+    stays flat however many links the crawl discovers.
     """
 
-    def __init__(self, allowed_netloc: str, timeout: int = 10) -> None:
-        self._allowed_netloc = allowed_netloc
-        self._visited = set()
-        self._queue = asyncio.Queue()
-        self._timeout = timeout
+    def __init__(
+        self,
+        scope: Union[CrawlScope, str, None],
+        scheduler: Optional[PolitenessScheduler] = None,
+        visited: Optional[SeenUrlStore] = None,
+        max_in_memory: Optional[int] = None,
+        spill_queue: Optional[SpillQueue] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """
+        Initialize the Frontier.
+        :param scope: The domains to crawl, or the netloc of the only one.
+        :param scheduler: The politeness scheduler. Defaults to one with no delay between requests.
+        :param visited: The store of seen URLs. Defaults to an exact set of URLs.
+        :param max_in_memory: The maximum number of queued URLs kept in memory. Defaults to no limit.
+        :param spill_queue: Where URLs beyond max_in_memory are spilled. Defaults to a temporary database.
+        :param checkpoint: An optional checkpoint, told about every URL queued.
+        :param metrics: An optional registry to record the queue depth and the deduplication of links in.
+        """
+        self._scope = CrawlScope.of(scope)
+        self._domains: dict[str, _DomainState] = {}
+        self._host_domains: dict[str, Optional[_DomainState]] = {}
+        # The ready hosts take turns: each pop starts looking from the next host.
+        self._turn = 0
+        self._visited = visited if visited is not None else ExactSeenStore()
+        # Each host has its own priority queue of (priority, sequence, url) entries. The sequence keeps URLs of equal
+        # priority in FIFO order.
+        self._queues: dict[str, list[QueueEntry]] = {}
+        self._sequence = itertools.count()
+        # URLs already in the spill queue, e.g. left by a previous run, count as queued.
+        self._size = len(spill_queue) if spill_queue else 0
+        self._in_memory = 0
+        self._max_in_memory = max_in_memory
+        self._spill_queue = spill_queue
+        self._checkpoint = checkpoint
+        self._scheduler = scheduler or PolitenessScheduler()
+        self._changed = asyncio.Event()
+        # The number of URLs returned by get_next_url and not yet marked done. Their pages may still add links.
+        self._in_flight = 0
+        self._metrics = metrics = metrics or MetricsRegistry()
+        metrics.gauge("queue_depth", "The URLs queued, in memory or spilled.", fn=lambda: self._size)
+        metrics.gauge("urls_in_flight", "The URLs being crawled.", fn=lambda: self._in_flight)
+        self._urls_offered = metrics.counter("urls_offered_total", "The in-scope URLs offered to the frontier.")
+        self._urls_added = metrics.counter("urls_added_total", "The URLs queued, as they were not seen before.")
+        metrics.gauge("dedupe_hit_rate", "The share of offered URLs already seen.", fn=self._dedupe_hit_rate)
+
+    async def add_url(self, url: str, priority: int = 0, normalized: bool = False) -> None:
+        """
+        Add a URL to the frontier, unless it is invalid or has already been seen.
+        :param url: The URL to add.
+        :param priority: The priority of the URL. Lower values are crawled first, e.g. the depth for shallow-first.
+        :param normalized: Whether the URL is already normalized, e.g. a link returned by the parser.
+        """
+        await self.add_urls((url,), priority, normalized)
 
-    async def add_url(self, url: str) -> None:
-        normalized_url = normalize_url(url)
-        if self._is_valid_url(normalized_url) and normalized_url not in self._visited:
-            self._visited.add(normalized_url)
-            await self._queue.put(normalized_url)
+    async def add_urls(self, urls: Iterable[str], priority: int = 0, normalized: bool = False) -> int:
+        """
+        Add many URLs to the frontier at once, e.g. all the links of a page, skipping the invalid and seen ones.
+        They are deduplicated against the seen URLs in one pass, and the workers are only woken up once.
+        :param urls: The URLs to add.
+        :param priority: The priority of the URLs. Lower values are crawled first.
+        :param normalized: Whether the URLs are already normalized, e.g. links returned by the parser.
+        :return: The number of URLs added.
+        """
+        if not normalized:
+            urls = map(normalize_url, urls)
+        in_scope = []
+        for url in urls:
+            rules = self._scope.domain_of(url)
+            if rules is not None and not self._domain(rules).done:
+                in_scope.append(url)
+        new_urls = self._visited.add_many(in_scope)
+        self._urls_offered.inc(len(in_scope))
+        self._urls_added.inc(len(new_urls))
+        for url in new_urls:
+            self._push(url_netloc(url), (priority, next(self._sequence), url))
+            if self._checkpoint:
+                self._checkpoint.note_seen(url, priority)
+        if new_urls:
+            self._changed.set()
+        return len(new_urls)
 
     async def get_next_url(self) -> Optional[str]:
+        """
+        Get the next URL to crawl, waiting until its host may be sent another request.
+        :return: The next URL, or None once the crawl is over: the queue is empty and no URL is in flight, so no more
+            links can be added.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            url, ready_at = self._pop_ready(now)
+            if url:
+                self._in_flight += 1
+                return url
+
+            if not self._size and not self._in_flight:
+                _logger.info("Queue is empty and no page is in flight, the crawl is over.")
+                # Wake up the other waiting workers, so they stop too.
+                self._changed.set()
+                return None
+
+            # Either every queued host is waiting for its delay or a free slot, or the pages in flight may still add
+            # links, so wait for the next change.
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=ready_at - now if ready_at < math.inf else None)
+            except asyncio.TimeoutError:
+                pass
+
+    def task_done(self, url: str, crawled: bool = True) -> None:
+        """
+        Mark a URL returned by get_next_url as processed, after its links were added, freeing its host's concurrency
+        slot. Every URL returned must be marked done, or the crawl never ends.
+        :param url: The URL that was processed.
+        :param crawled: Whether the page was crawled, or failed, in which case it doesn't count towards the page limit
+            of its domain.
+        """
+        host = url_netloc(url)
+        self._in_flight -= 1
+        self._scheduler.on_done(host)
+        domain = self._host_domains.get(host)
+        if domain is not None:
+            domain.in_flight -= 1
+            if crawled:
+                domain.crawled += 1
+            else:
+                domain.failed += 1
+            if domain.rules.max_pages is not None and domain.crawled >= domain.rules.max_pages:
+                self._finish_domain(domain)
+        self._changed.set()
+
+    def record_response(self, url: str, status: Optional[int], latency: float) -> None:
+        """
+        Feed a response back to the scheduler, so it can adapt how fast the host is crawled.
+        :param url: The URL that was requested.
+        :param status: The HTTP status of the response, or None if the request failed without one.
+        :param latency: The time it took for the response to arrive, in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        host = url_netloc(url)
+        self._scheduler.on_response(host, status, latency, loop.time())
+        domain = self._host_domain(host)
+        if domain is not None:
+            self._metrics.histogram(
+                "domain_response_seconds", "The time to the first byte of responses.", {"domain": domain.rules.netloc}
+            ).observe(latency)
+        self._changed.set()
+
+    def restore(self, checkpoint: Checkpoint) -> None:
+        """
+        Restore the seen URLs and the queue from a checkpoint, to resume a crawl.
+        :param checkpoint: The checkpoint to restore from.
+        """
+        for url in checkpoint.seen():
+            self._visited.add(url)
+        for url, priority in checkpoint.pending():
+            self._push(url_netloc(url), (priority, next(self._sequence), url))
+        self._changed.set()
+        _logger.info(f"Restored {len(self._visited)} seen URLs, {self._size} of them still to crawl.")
+
+    def close(self) -> None:
+        """
+        Close the spill queue, if any.
+        """
+        if self._spill_queue:
+            self._spill_queue.close()
+
+    def _dedupe_hit_rate(self) -> float:
+        offered = self._urls_offered.value
+        return (offered - self._urls_added.value) / offered if offered else 0.0
+
+    def _domain(self, rules: DomainRules) -> _DomainState:
+        domain = self._domains.get(rules.netloc)
+        if domain is None:
+            domain = self._domains[rules.netloc] = _DomainState(rules)
+            labels = {"domain": rules.netloc}
+            self._metrics.counter(
+                "domain_pages_crawled_total", "The pages crawled on the domain.", labels, fn=lambda: domain.crawled
+            )
+            self._metrics.counter(
+                "domain_pages_failed_total", "The pages which failed on the domain.", labels, fn=lambda: domain.failed
+            )
+        return domain
+
+    def _host_domain(self, host: str) -> Optional[_DomainState]:
+        """
+        Get the domain a host belongs to, applying the domain's concurrency limit to the host the first time.
+        """
         try:
-            return await asyncio.wait_for(self._queue.get(), timeout=self._timeout)
-        except asyncio.TimeoutError:
-            _logger.error("Queue is empty")
-            return None
+            return self._host_domains[host]
+        except KeyError:
+            pass
+        rules = self._scope.domain_of_netloc(host)
+        domain = self._host_domains[host] = self._domain(rules) if rules else None
+        if domain is not None:
+            domain.hosts.add(host)
+            if rules.max_concurrency is not None:
+                self._scheduler.set_max_concurrency(host, rules.max_concurrency)
+        return domain
+
+    def _finish_domain(self, domain: _DomainState) -> None:
+        """
+        Drop the URLs still queued on a domain which reached its page limit, so they don't hold the crawl up.
+        """
+        if domain.done:
+            return
+        domain.done = True
+        dropped = 0
+        for host in domain.hosts:
+            queue = self._queues.pop(host, [])
+            dropped += len(queue)
+            self._in_memory -= len(queue)
+            while self._spill_queue and (spilled := self._spill_queue.pop_many(host, _REFILL_BATCH_SIZE)):
+                dropped += len(spilled)
+        self._size -= dropped
+        _logger.info(f"Reached the page limit of {domain.rules.netloc}, dropped {dropped} queued URLs.")
+
+    def _push(self, host: str, entry: QueueEntry) -> None:
+        self._host_domain(host)
+        self._size += 1
+        # Once a host has spilled, its new URLs are spilled too, so they are paged back in order.
+        if self._max_in_memory is not None and (
+            self._in_memory >= self._max_in_memory or (self._spill_queue and self._spill_queue.count(host))
+        ):
+            if self._spill_queue is None:
+                self._spill_queue = SpillQueue()
+            self._spill_queue.push(host, entry)
+            return
+        heapq.heappush(self._queues.setdefault(host, []), entry)
+        self._in_memory += 1
+
+    def _refill(self, host: str, queue: list[QueueEntry]) -> None:
+        """
+        Page a host's spilled URLs back into memory, as far as the window allows.
+        """
+        limit = _REFILL_BATCH_SIZE
+        if self._max_in_memory is not None:
+            limit = min(limit, max(1, self._max_in_memory - self._in_memory))
+        for entry in self._spill_queue.pop_many(host, limit):
+            heapq.heappush(queue, entry)
+            self._in_memory += 1
+
+    def _pop_ready(self, now: float) -> tuple[Optional[str], float]:
+        """
+        Pop the highest priority URL among the hosts that may be sent a request now. Among the ready hosts whose next
+        URL has the same priority, the hosts take turns.
+        :param now: The current time, on the event loop clock.
+        :return: The URL, or None and the earliest time a host becomes ready.
+        """
+        if self._spill_queue:
+            for host in self._spill_queue.hosts():
+                queue = self._queues.setdefault(host, [])
+                if not queue:
+                    self._refill(host, queue)
+
+        hosts = list(self._queues)
+        best_host = None
+        best_priority = math.inf
+        earliest = math.inf
+        for index in range(len(hosts)):
+            host = hosts[(self._turn + index) % len(hosts)]
+            queue = self._queues[host]
+            if not queue:
+                continue
+            domain = self._host_domains[host]
+            if domain is not None and domain.at_limit():
+                continue  # Waiting for the pages in flight: if any fails, another URL of the domain may be crawled.
+            ready_at = self._scheduler.ready_at(host)
+            if ready_at > now:
+                earliest = min(earliest, ready_at)
+            elif queue[0][0] < best_priority:
+                best_host = host
+                best_priority = queue[0][0]
+
+        if best_host is None:
+            return None, earliest
+
+        queue = self._queues[best_host]
+        _, _, url = heapq.heappop(queue)
+        if not queue:
+            del self._queues[best_host]
+        self._turn += 1
+        self._size -= 1
+        self._in_memory -= 1
+        self._scheduler.on_dispatch(best_host, now)
+        domain = self._host_domains[best_host]
+        if domain is not None:
+            domain.in_flight += 1
+        return url, now
 
-    def _is_valid_url(self, url: str) -> bool:
-        parsed_url = urlparse(url)
-        return parsed_url.netloc == self._allowed_netloc
+    @property
+    def visited(self) -> SeenUrlStore:
+        return self._visited
 
     def has_next(self) -> bool:
-        return not self._queue.empty()
+        return self._size > 0
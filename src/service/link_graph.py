@@ -0,0 +1,216 @@
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Iterator
+
+_MAGIC = b"LGRF"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIQQQ")  # magic, version, nodes, pages, edges
+
+
+class LinkGraph:
+    """
+    LinkGraph stores the crawl's link graph compactly: every URL is interned once and given an integer node id, and the
+    links of the recorded pages are kept in CSR form, i.e. one flat array of target ids with one offset per page.
+    A link then costs 4 bytes, rather than a pointer in a set plus a copy of its URL on every page that links to it.
+    """
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self._urls: list[str] = []
+        self._page_nodes = array("I")  # The node id of each recorded page
+        self._offsets = array("Q", [0])  # The links of page i are targets[offsets[i]:offsets[i + 1]]
+        self._targets = array("I")
+        self._page_index: dict[int, int] = {}  # Maps a page's node id to its index in page_nodes
+
+    def intern(self, url: str) -> int:
+        """
+        Get the node id of a URL, assigning it one if it has none.
+        :param url: The URL.
+        :return: The node id.
+        """
+        node = self._ids.get(url)
+        if node is None:
+            node = self._ids[url] = len(self._urls)
+            self._urls.append(url)
+        return node
+
+    def add_page(self, url: str, links: set[str]) -> None:
+        """
+        Add a recorded page and its links to the graph.
+        :param url: The URL of the page.
+        :param links: The links found on the page.
+        """
+        node = self.intern(url)
+        self._page_index[node] = len(self._page_nodes)
+        self._page_nodes.append(node)
+        self._targets.extend(self.intern(link) for link in links)
+        self._offsets.append(len(self._targets))
+
+    def links(self, url: str) -> set[str]:
+        """
+        Get the links of a recorded page.
+        :param url: The URL of the page.
+        :return: The links found on the page.
+        """
+        index = self._page_index[self._ids[url]]
+        return {self._urls[target] for target in self._targets[self._offsets[index] : self._offsets[index + 1]]}
+
+    def pages(self) -> Iterator[str]:
+        """
+        Get the URLs of the recorded pages, in the order they were recorded.
+        """
+        return (self._urls[node] for node in self._page_index)
+
+    def has_page(self, url: str) -> bool:
+        """
+        Check whether a page was recorded.
+        :param url: The URL of the page.
+        :return: True if it was recorded.
+        """
+        node = self._ids.get(url)
+        return node is not None and node in self._page_index
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_index)
+
+    @property
+    def node_count(self) -> int:
+        return len(self._urls)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._targets)
+
+    def in_degrees(self) -> array:
+        """
+        Count the links pointing to each node, across the recorded pages.
+        :return: The in-degree of each node, indexed by node id.
+        """
+        degrees = array("I", bytes(4 * len(self._urls)))
+        for target in self._targets:
+            degrees[target] += 1
+        return degrees
+
+    def top_linked(self, count: int = 10) -> list[tuple[str, int]]:
+        """
+        Get the most linked to URLs.
+        :param count: The number of URLs to return.
+        :return: The URLs and their in-degree, most linked first.
+        """
+        degrees = self.in_degrees()
+        top = sorted(range(len(degrees)), key=degrees.__getitem__, reverse=True)[:count]
+        return [(self._urls[node], degrees[node]) for node in top]
+
+    def orphans(self) -> list[str]:
+        """
+        Get the recorded pages that no other recorded page links to, e.g. pages only reachable from the start URL or a
+        sitemap.
+        :return: The URLs of the orphan pages.
+        """
+        linked = bytearray(len(self._urls))
+        for index, node in enumerate(self._page_nodes):
+            for target in self._targets[self._offsets[index] : self._offsets[index + 1]]:
+                if target != node:
+                    linked[target] = 1
+        return [self._urls[node] for node in self._page_index if not linked[node]]
+
+    def memory_bytes(self) -> int:
+        """
+        Get the approximate memory used by the graph, excluding the URL strings themselves.
+        :return: The memory used, in bytes.
+        """
+        return (
+            sys.getsizeof(self._ids)
+            + sys.getsizeof(self._urls)
+            + sys.getsizeof(self._page_index)
+            + sum(sys.getsizeof(values) for values in (self._page_nodes, self._offsets, self._targets))
+        )
+
+    def export_edge_list(self, path: str) -> None:
+        """
+        Write the graph as a text edge list: one "source target" line of node ids per link, and the URL of each node,
+        one per line in id order, to a ".nodes" file next to it.
+        :param path: The path of the edge list.
+        """
+        with open(path + ".nodes", "w", encoding="utf-8") as nodes_file:
+            nodes_file.writelines(url + "\n" for url in self._urls)
+        with open(path, "w", encoding="utf-8") as edges_file:
+            for index, node in enumerate(self._page_nodes):
+                edges_file.writelines(
+                    f"{node} {target}\n" for target in self._targets[self._offsets[index] : self._offsets[index + 1]]
+                )
+
+    def export_binary(self, path: str) -> None:
+        """
+        Write the graph in a compact binary format: a header, the newline-joined URLs, then the little-endian page node,
+        offset and target arrays. It can be read back with LinkGraph.load.
+        :param path: The path of the file.
+        """
+        urls = "\n".join(self._urls).encode()
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, len(self._urls), len(self._page_nodes), len(self._targets)))
+            file.write(struct.pack("<Q", len(urls)))
+            file.write(urls)
+            for values in (self._page_nodes, self._offsets, self._targets):
+                file.write(_little_endian(values).tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "LinkGraph":
+        """
+        Read a graph written by export_binary.
+        :param path: The path of the file.
+        :return: The graph.
+        """
+        graph = cls()
+        with open(path, "rb") as file:
+            magic, version, nodes, pages, edges = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Not a link graph file: {path}")
+            (urls_size,) = struct.unpack("<Q", file.read(8))
+            graph._urls = file.read(urls_size).decode().split("\n") if nodes else []
+            graph._ids = {url: node for node, url in enumerate(graph._urls)}
+            graph._page_nodes = _read_array(file, "I", pages)
+            graph._offsets = _read_array(file, "Q", pages + 1)
+            graph._targets = _read_array(file, "I", edges)
+        graph._page_index = {node: index for index, node in enumerate(graph._page_nodes)}
+        return graph
+
+
+class LinkGraphResults(Mapping):
+    """
+    A read-only view of the recorded pages of a LinkGraph as a mapping of URLs to their links.
+    """
+
+    def __init__(self, graph: LinkGraph) -> None:
+        self._graph = graph
+
+    def __getitem__(self, url: str) -> set[str]:
+        if not self._graph.has_page(url):
+            raise KeyError(url)
+        return self._graph.links(url)
+
+    def __contains__(self, url: object) -> bool:
+        return isinstance(url, str) and self._graph.has_page(url)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._graph.pages()
+
+    def __len__(self) -> int:
+        return self._graph.page_count
+
+
+def _little_endian(values: array) -> array:
+    if struct.pack("=I", 1) == struct.pack("<I", 1):
+        return values
+    swapped = array(values.typecode, values)
+    swapped.byteswap()
+    return swapped
+
+
+def _read_array(file, typecode: str, length: int) -> array:
+    values = array(typecode)
+    values.frombytes(file.read(values.itemsize * length))
+    return _little_endian(values)
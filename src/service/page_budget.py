@@ -0,0 +1,64 @@
+import asyncio
+
+
+class PageBudget:
+    """
+    PageBudget shares the maximum number of pages between all the Crawler workers.
+    A worker reserves a slot before fetching a page, then commits it once the page is recorded, or releases it if the
+    fetch failed. Slots are never reserved beyond the budget, so exactly max_pages pages are fetched successfully, and no
+    fetch is ever wasted on a page that would go over it.
+    """
+
+    def __init__(self, max_pages: int, used: int = 0) -> None:
+        """
+        Initialize the PageBudget.
+        :param max_pages: The maximum number of pages to crawl.
+        :param used: The number of pages already crawled, e.g. when resuming a crawl.
+        """
+        self._max_pages = max_pages
+        self._committed = used
+        self._reserved = 0
+        self._changed = asyncio.Event()
+        self.exhausted = asyncio.Event()
+        if self._committed >= self._max_pages:
+            self.exhausted.set()
+
+    async def reserve(self) -> bool:
+        """
+        Reserve a slot for a page. If every remaining slot is reserved, wait until one is committed or released.
+        :return: True if a slot was reserved, False if the budget is exhausted.
+        """
+        while not self.exhausted.is_set() and not self._has_free_slot():
+            self._changed.clear()
+            await self._changed.wait()
+        if self.exhausted.is_set():
+            return False
+        self._reserved += 1
+        return True
+
+    def commit(self) -> None:
+        """
+        Use a reserved slot, as its page was crawled successfully.
+        """
+        self._reserved -= 1
+        self._committed += 1
+        if self._committed >= self._max_pages:
+            self.exhausted.set()
+        self._changed.set()
+
+    def release(self) -> None:
+        """
+        Give a reserved slot back, as its page could not be crawled.
+        """
+        self._reserved -= 1
+        self._changed.set()
+
+    @property
+    def used(self) -> int:
+        """
+        The number of pages crawled successfully.
+        """
+        return self._committed
+
+    def _has_free_slot(self) -> bool:
+        return self._committed + self._reserved < self._max_pages
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from src.service.parser import parse
+
+_logger = logging.getLogger(__name__)
+
+# Normalised URLs never contain a newline (urlsplit strips them), so the links of a page can travel back from the worker
+# as a single string, which pickles far cheaper than a set of many small strings.
+_LINK_SEPARATOR = "\n"
+
+
+def _parse_in_worker(parse_fn: Callable[[str, str], set[str]], base_url: str, html: str) -> str:
+    """
+    Parse a page inside a worker process.
+    :param parse_fn: The link extraction engine. Module-level functions are pickled by reference, so this is cheap.
+    :param base_url: The URL of the page being parsed.
+    :param html: The HTML content of the page.
+    :return: The extracted links joined into a single string.
+    """
+    return _LINK_SEPARATOR.join(parse_fn(base_url, html))
+
+
+def _warm_up() -> None:
+    """
+    No-op task used to start the worker processes before the crawl begins.
+    """
+
+
+class ParsePool:
+    """
+    ParsePool shards the parsing of pages across CPU cores.
+    It keeps a pool of long-lived worker processes and hands them the raw HTML, so that parsing a large page no longer
+    blocks the event loop and every worker can keep fetching while pages are parsed.
+    """
+
+    def __init__(self, processes: int, parse_fn: Callable[[str, str], set[str]] = parse) -> None:
+        """
+        Initialize the ParsePool.
+        :param processes: The number of parser processes to run.
+        :param parse_fn: The link extraction engine to run in the parser processes.
+        """
+        self._processes = processes
+        self._parse_fn = parse_fn
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def start(self) -> None:
+        """
+        Start the worker processes, so the first pages don't pay the process start-up cost.
+        """
+        if self._executor:
+            return
+        # Spawn rather than fork: forking a process that is running an event loop and open sockets is unsafe.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._processes, mp_context=multiprocessing.get_context("spawn")
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self._executor, _warm_up) for _ in range(self._processes))
+        )
+        _logger.debug(f"Started {self._processes} parser processes.")
+
+    async def parse(self, base_url: str, html: str) -> set[str]:
+        """
+        Parse the HTML content in a worker process and extract all valid links.
+        :param base_url: The URL of the page being parsed (used to resolve relative URLs).
+        :param html: The HTML content of the page.
+        :return: A set of normalized, absolute URLs.
+        """
+        if not self._executor:
+            await self.start()
+        joined_links = await asyncio.get_running_loop().run_in_executor(
+            self._executor, _parse_in_worker, self._parse_fn, base_url, html
+        )
+        return set(joined_links.split(_LINK_SEPARATOR)) if joined_links else set()
+
+    async def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        if self._executor:
+            await asyncio.to_thread(self._executor.shutdown)
+            self._executor = None
@@ -1,12 +1,17 @@
-from typing import Optional
+from html.parser import HTMLParser
+from typing import Callable, Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup  # HTML parsing library
 
-from src.utils import normalize_url
+from src.utils import resolve_url, resolve_urls
 
 _ALLOWED_PREFIXES = ("http", "https", "/")
 
+# Links found before the <base> element can only be resolved once it has been seen, but <base> must appear in the
+# <head>, so links are held back at most until the <body> starts.
+_BODY_TAG = "body"
+
 
 def parse(base_url: str, html: str) -> set[str]:
     """
@@ -16,15 +21,98 @@ def parse(base_url: str, html: str) -> set[str]:
     :return: A set of normalized, absolute URLs.
     """
     soup = BeautifulSoup(html, "html.parser")
-    links = set()
 
-    for anchor in soup.find_all("a", href=True):
-        href = anchor["href"]
-        absolute_url = _make_absolute_url(base_url, href)
-        if absolute_url:
-            links.add(absolute_url)
+    base = soup.find("base", href=True)
+    if base:
+        base_url = urljoin(base_url, base["href"])
+
+    return _make_absolute_urls(base_url, [anchor["href"] for anchor in soup.find_all("a", href=True)])
+
+
+def parse_streaming(base_url: str, html: str) -> set[str]:
+    """
+    Extract all valid links in a single pass over the HTML content, without building a document tree.
+    :param base_url: The URL of the page being parsed (used to resolve relative URLs).
+    :param html: The HTML content of the page.
+    :return: A set of normalized, absolute URLs.
+    """
+    extractor = LinkExtractor(base_url)
+    extractor.feed(html)
+    return extractor.close()
+
 
-    return links
+class LinkExtractor(HTMLParser):
+    """
+    LinkExtractor scans HTML for links as it is fed, without building a document tree.
+    It can be fed the document in chunks as they arrive, and calls on_link with each new link as soon as it is found.
+    """
+
+    def __init__(self, base_url: str, on_link: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Initialize the LinkExtractor.
+        :param base_url: The URL of the page being parsed (used to resolve relative URLs).
+        :param on_link: An optional callback, called with each new normalized, absolute URL as soon as it is found.
+        """
+        super().__init__()
+        self._base_url = base_url
+        self._on_link = on_link
+        self._base_resolved = False
+        self._pending_hrefs: list[str] = []
+        self.links: set[str] = set()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href is None:
+                return
+            if self._base_resolved:
+                self._add_link(href)
+            else:
+                self._pending_hrefs.append(href)
+        elif tag == "base" and not self._base_resolved:
+            href = dict(attrs).get("href")
+            if href is not None:
+                self._base_url = urljoin(self._base_url, href)
+                self._resolve_base()
+        elif tag == _BODY_TAG:
+            self._resolve_base()
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+
+    def close(self) -> set[str]:
+        """
+        Flush the remaining input.
+        :return: A set of normalized, absolute URLs found in the document.
+        """
+        super().close()
+        self._resolve_base()
+        return self.links
+
+    def _resolve_base(self) -> None:
+        self._base_resolved = True
+        if not self._pending_hrefs:
+            return
+        new_links = _make_absolute_urls(self._base_url, self._pending_hrefs) - self.links
+        self._pending_hrefs.clear()
+        self.links |= new_links
+        if self._on_link:
+            for link in new_links:
+                self._on_link(link)
+
+    def _add_link(self, href: str) -> None:
+        absolute_url = _make_absolute_url(self._base_url, href)
+        if absolute_url and absolute_url not in self.links:
+            self.links.add(absolute_url)
+            if self._on_link:
+                self._on_link(absolute_url)
+
+
+# The link extraction engines, selectable at runtime. They all share the parse(base_url, html) signature.
+PARSERS: dict[str, Callable[[str, str], set[str]]] = {
+    "bs4": parse,
+    "streaming": parse_streaming,
+}
 
 
 def _make_absolute_url(base_url: str, href: str) -> Optional[str]:
@@ -38,10 +126,15 @@ def _make_absolute_url(base_url: str, href: str) -> Optional[str]:
     if not href or not href.startswith(_ALLOWED_PREFIXES):
         return None
 
-    # Join the base URL and the href to form an absolute URL
-    absolute_url = urljoin(base_url, href)
+    # Join the base URL and the href to form an absolute URL, and normalize it
+    return resolve_url(base_url, href)
 
-    # Normalize the URL
-    normalized_url = normalize_url(absolute_url)
 
-    return normalized_url
+def _make_absolute_urls(base_url: str, hrefs: list[str]) -> set[str]:
+    """
+    Convert all the hrefs of a page to absolute URLs and normalize them, in one go.
+    :param base_url: The base URL of the page.
+    :param hrefs: The href attributes from the page's anchor tags.
+    :return: The set of normalized absolute URLs, without the invalid ones.
+    """
+    return resolve_urls(base_url, (href for href in hrefs if href and href.startswith(_ALLOWED_PREFIXES)))
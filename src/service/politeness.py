@@ -0,0 +1,180 @@
+import logging
+import math
+from typing import Optional
+
+_logger = logging.getLogger(__name__)
+
+# Responses that mean the host is asking us to slow down.
+_THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class _HostState:
+    """
+    The politeness state of a single host.
+    """
+
+    __slots__ = (
+        "concurrency",
+        "max_concurrency",
+        "delay",
+        "in_flight",
+        "next_allowed",
+        "latency",
+        "baseline_latency",
+        "last_decrease",
+    )
+
+    def __init__(self, concurrency: float, max_concurrency: int, delay: float) -> None:
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+        self.in_flight = 0
+        self.next_allowed = 0.0
+        self.latency: Optional[float] = None  # Exponentially weighted moving average of the response latency
+        self.baseline_latency = math.inf  # Fastest response seen, i.e. the latency of an unloaded host
+        self.last_decrease = -math.inf
+
+
+class PolitenessScheduler:
+    """
+    PolitenessScheduler decides when each host may be sent its next request.
+    It enforces a minimum delay between requests to the same host, and a per-host concurrency limit that adapts to the
+    host: it grows additively while responses stay fast, and shrinks multiplicatively when the latency climbs or the
+    host answers 429/503, in which case the delay between requests is also increased.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = 0.0,
+        max_delay: float = 30.0,
+        initial_concurrency: int = 2,
+        max_concurrency: int = 8,
+        slowdown_factor: float = 3.0,
+        latency_smoothing: float = 0.2,
+    ) -> None:
+        """
+        Initialize the PolitenessScheduler.
+        :param min_delay: The minimum delay between two requests to the same host, in seconds.
+        :param max_delay: The maximum delay the scheduler backs off to, in seconds.
+        :param initial_concurrency: The number of concurrent requests a host starts with.
+        :param max_concurrency: The maximum number of concurrent requests to a host.
+        :param slowdown_factor: How much slower than its fastest response a host may get before we back off.
+        :param latency_smoothing: The weight of the latest response in the moving average of the latency.
+        """
+        self._min_delay = min_delay
+        self._max_delay = max(max_delay, min_delay)
+        self._max_concurrency = max(1, max_concurrency)
+        self._initial_concurrency = min(max(1, initial_concurrency), self._max_concurrency)
+        self._slowdown_factor = slowdown_factor
+        self._latency_smoothing = latency_smoothing
+        self._hosts: dict[str, _HostState] = {}
+
+    def ready_at(self, host: str) -> float:
+        """
+        Get the time at which the host may be sent its next request.
+        :param host: The netloc of the host.
+        :return: The time, on the event loop clock, or infinity if the host is at its concurrency limit.
+        """
+        state = self._state(host)
+        if state.in_flight >= int(state.concurrency):
+            return math.inf
+        return state.next_allowed
+
+    def on_dispatch(self, host: str, now: float) -> None:
+        """
+        Record that a request to the host is about to be sent.
+        :param host: The netloc of the host.
+        :param now: The current time, on the event loop clock.
+        """
+        state = self._state(host)
+        state.in_flight += 1
+        state.next_allowed = now + state.delay
+
+    def on_done(self, host: str) -> None:
+        """
+        Record that a request to the host has been fully processed, freeing its concurrency slot.
+        :param host: The netloc of the host.
+        """
+        state = self._state(host)
+        state.in_flight = max(0, state.in_flight - 1)
+
+    def on_response(self, host: str, status: Optional[int], latency: float, now: float) -> None:
+        """
+        Adapt the host's concurrency and delay to a response.
+        :param host: The netloc of the host.
+        :param status: The HTTP status of the response, or None if the request failed without one.
+        :param latency: The time it took for the response to arrive, in seconds.
+        :param now: The current time, on the event loop clock.
+        """
+        state = self._state(host)
+        if status in _THROTTLE_STATUSES:
+            self._back_off(host, state, now, throttled=True)
+            return
+        if status is None:
+            self._back_off(host, state, now, throttled=False)
+            return
+
+        if state.latency is None:
+            state.latency = latency
+        else:
+            state.latency += self._latency_smoothing * (latency - state.latency)
+        state.baseline_latency = min(state.baseline_latency, latency)
+
+        if state.latency > self._slowdown_factor * state.baseline_latency:
+            self._back_off(host, state, now, throttled=False)
+        else:
+            # Additive increase: roughly one extra concurrent request per round of responses.
+            state.concurrency = min(state.max_concurrency, state.concurrency + 1 / state.concurrency)
+            state.delay = max(self._min_delay, state.delay / 2)
+
+    def set_min_delay(self, host: str, delay: float) -> None:
+        """
+        Raise the delay between two requests to a host, e.g. to honour a crawl delay it asked for.
+        :param host: The netloc of the host.
+        :param delay: The minimum delay, in seconds.
+        """
+        state = self._state(host)
+        state.delay = max(state.delay, delay)
+
+    def set_max_concurrency(self, host: str, max_concurrency: int) -> None:
+        """
+        Lower the maximum number of concurrent requests to a host, e.g. to honour the limit of its domain.
+        :param host: The netloc of the host.
+        :param max_concurrency: The maximum number of concurrent requests.
+        """
+        state = self._state(host)
+        state.max_concurrency = min(state.max_concurrency, max(1, max_concurrency))
+        state.concurrency = min(state.concurrency, state.max_concurrency)
+
+    def concurrency(self, host: str) -> int:
+        """
+        Get the current concurrency limit of a host.
+        :param host: The netloc of the host.
+        :return: The number of requests that may be in flight to the host at once.
+        """
+        return int(self._state(host).concurrency)
+
+    def delay(self, host: str) -> float:
+        """
+        Get the current delay between two requests to a host.
+        :param host: The netloc of the host.
+        :return: The delay, in seconds.
+        """
+        return self._state(host).delay
+
+    def _back_off(self, host: str, state: _HostState, now: float, throttled: bool) -> None:
+        # Only back off once per round trip, otherwise a burst of slow responses would collapse the concurrency.
+        if now - state.last_decrease < (state.latency or 0.0):
+            return
+        state.last_decrease = now
+        state.concurrency = max(1.0, state.concurrency / 2)
+        if throttled:
+            state.delay = min(self._max_delay, max(state.delay * 2, self._min_delay, 1.0))
+            state.next_allowed = max(state.next_allowed, now + state.delay)
+        _logger.debug(f"Backing off {host}: concurrency={int(state.concurrency)}, delay={state.delay:.2f}s.")
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self._initial_concurrency, self._max_concurrency, self._min_delay)
+        return state
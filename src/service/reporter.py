@@ -1,4 +1,11 @@
+import asyncio
 import logging
+from collections.abc import Mapping
+from typing import Optional
+
+from src.service.checkpoint import Checkpoint
+from src.service.link_graph import LinkGraph, LinkGraphResults
+from src.service.sinks import Record, ResultSink
 
 _logger = logging.getLogger(__name__)
 
@@ -6,31 +13,79 @@ _logger = logging.getLogger(__name__)
 class Reporter:
     """
     Reporter is responsible for recording the URLs and their discovered links.
-    It maintains a dictionary mapping URLs to sets of links.
-    The output method prints the results to the console.
+    Without a sink, it keeps the results in a compact link graph, exposed as a mapping of URLs to sets of links, and the
+    output method prints them to the console.
+    With a sink, records are streamed to the sink in batches as they are produced, written by a background task. When
+    the sink falls behind, recording waits, so the backpressure reaches the workers. The link graph is then only kept
+    if asked for.
     """
 
-    def __init__(self, max_size: int) -> None:
+    def __init__(
+        self,
+        max_size: int,
+        checkpoint: Optional[Checkpoint] = None,
+        sink: Optional[ResultSink] = None,
+        batch_size: int = 100,
+        max_pending_batches: int = 8,
+        keep_graph: bool = False,
+    ) -> None:
         """
         Initialize the Reporter.
+        :param max_size: The maximum number of pages to record.
+        :param checkpoint: An optional checkpoint, told about every page recorded.
+        :param sink: An optional sink to stream the records to, instead of keeping them in memory.
+        :param batch_size: The number of records written to the sink at once.
+        :param max_pending_batches: The number of batches waiting to be written before recording blocks.
+        :param keep_graph: Whether to also keep the link graph in memory when streaming to a sink, e.g. to export it.
         """
         self._max_size = max_size
-        self.results: dict[str, set[str]] = {}  # Maps URLs to their discovered links
+        self._checkpoint = checkpoint
+        self._sink = sink
+        self._batch_size = batch_size
+        self._batch: list[Record] = []
+        self._batches: asyncio.Queue[Optional[list[Record]]] = asyncio.Queue(maxsize=max_pending_batches)
+        self._writer: Optional[asyncio.Task] = None
+        self.count = 0  # The number of pages recorded
+        # The link graph of the recorded pages, when there is no sink or it was asked for
+        self.graph: Optional[LinkGraph] = LinkGraph() if sink is None or keep_graph else None
+        # Maps URLs to their discovered links, when there is no sink
+        self.results: Mapping[str, set[str]] = LinkGraphResults(self.graph) if sink is None else {}
 
-    def record(self, url: str, links: set[str]) -> None:
+    async def record(self, url: str, links: set[str]) -> None:
         """
         Record the links found on a page.
         :param url: The URL of the page.
         :param links: A set of links found on the page.
         """
-        if len(self.results) >= self._max_size:
+        if self.count >= self._max_size:
             _logger.debug("Tried to record despite max size reached.")
             return
-        self.results[url] = links
+        self.count += 1
+        if self._checkpoint:
+            self._checkpoint.note_result(url, links)
+        if self.graph is not None:
+            self.graph.add_page(url, links)
+        if self._sink is None:
+            return
+
+        self._batch.append((url, links))
+        if len(self._batch) >= self._batch_size:
+            await self._flush_batch()
+
+    def restore(self, checkpoint: Checkpoint) -> None:
+        """
+        Restore the recorded pages from a checkpoint, to resume a crawl. With a sink, they were already written, so
+        only their count and, if kept, the link graph are restored.
+        :param checkpoint: The checkpoint to restore from.
+        """
+        for url, links in checkpoint.results():
+            self.count += 1
+            if self.graph is not None:
+                self.graph.add_page(url, links)
 
     def output(self):
         """
-        Output the results to the console using logger.info.
+        Output the results to the console using logger.info, when they are kept in memory.
         """
         for url, links in self.results.items():
             _logger.info(f"URL: {url}")
@@ -38,3 +93,30 @@ class Reporter:
             for link in links:
                 _logger.info(f"  - {link}")
             _logger.info("")  # Add a blank line between entries
+
+    async def close(self) -> None:
+        """
+        Write the remaining records to the sink, and close it.
+        """
+        if self._sink is None:
+            return
+        await self._flush_batch()
+        if self._writer:
+            await self._batches.put(None)
+            await self._writer
+        await asyncio.to_thread(self._sink.close)
+
+    async def _flush_batch(self) -> None:
+        if not self._batch:
+            return
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_batches())
+        elif self._writer.done():
+            self._writer.result()  # Raise the error that stopped the writer, rather than block forever
+        batch, self._batch = self._batch, []
+        # Blocks while max_pending_batches are waiting to be written.
+        await self._batches.put(batch)
+
+    async def _write_batches(self) -> None:
+        while (batch := await self._batches.get()) is not None:
+            await asyncio.to_thread(self._sink.write_batch, batch)
@@ -0,0 +1,108 @@
+from typing import Iterable, NamedTuple, Optional, Union
+from urllib.parse import urlsplit
+
+from src.utils import url_netloc
+
+# The maximum number of netlocs whose domain is remembered. Links to other sites are looked up too, so it is bounded.
+_MAX_CACHED_NETLOCS = 100_000
+
+
+class DomainRules(NamedTuple):
+    """
+    The scope and limits of one of the domains crawled.
+    """
+
+    netloc: str  # The netloc (hostname + port) of the domain
+    path_prefix: str = ""  # Only the URLs whose path starts with it are crawled, e.g. "/blog"
+    include_subdomains: bool = False  # Whether the subdomains, e.g. "www.monzo.com" for "monzo.com", are crawled too
+    max_pages: Optional[int] = None  # The maximum number of pages crawled on the domain, None for no limit
+    max_concurrency: Optional[int] = None  # The maximum number of concurrent requests to each of its hosts
+
+    @classmethod
+    def from_seed(cls, line: str) -> tuple[str, "DomainRules"]:
+        """
+        Parse a line of a seed list: a start URL, optionally followed by the domain's rules as key=value pairs, e.g.
+        "https://monzo.com/blog path_prefix=/blog max_pages=100 include_subdomains=true".
+        :param line: The line.
+        :return: The start URL, and the rules of its domain.
+        """
+        url, *options = line.split()
+        rules = cls(urlsplit(url).netloc.lower())
+        for option in options:
+            key, _, value = option.partition("=")
+            if key == "path_prefix":
+                rules = rules._replace(path_prefix=value)
+            elif key == "include_subdomains":
+                rules = rules._replace(include_subdomains=value.lower() in ("", "1", "true", "yes"))
+            elif key in ("max_pages", "max_concurrency"):
+                rules = rules._replace(**{key: int(value)})
+            else:
+                raise ValueError(f"Unknown seed option: {option}")
+        return url, rules
+
+
+class CrawlScope:
+    """
+    CrawlScope decides which URLs are crawled, and which domain they belong to, when crawling one or many domains.
+    Looking up a URL's domain is a dictionary lookup on its netloc, remembered for the subdomain matching.
+    """
+
+    def __init__(self, domains: Iterable[DomainRules]) -> None:
+        """
+        Initialize the CrawlScope.
+        :param domains: The rules of the domains to crawl.
+        """
+        self._domains = {domain.netloc.lower(): domain for domain in domains}
+        self._by_netloc: dict[str, Optional[DomainRules]] = {}
+
+    @classmethod
+    def of(cls, scope: Union["CrawlScope", str, None]) -> "CrawlScope":
+        """
+        Get the scope of a single netloc, or the scope itself.
+        :param scope: A scope, or the netloc of the only domain to crawl, None or "" to crawl nothing.
+        :return: The scope.
+        """
+        if isinstance(scope, CrawlScope):
+            return scope
+        return cls([DomainRules(scope)] if scope else [])
+
+    @property
+    def domains(self) -> list[DomainRules]:
+        return list(self._domains.values())
+
+    def domain_of(self, url: str) -> Optional[DomainRules]:
+        """
+        Get the domain a URL belongs to.
+        :param url: The URL.
+        :return: The rules of its domain, or None if it is out of scope.
+        """
+        domain = self.domain_of_netloc(url_netloc(url))
+        if domain and domain.path_prefix and not urlsplit(url).path.startswith(domain.path_prefix):
+            return None
+        return domain
+
+    def domain_of_netloc(self, netloc: str) -> Optional[DomainRules]:
+        """
+        Get the domain a host belongs to, regardless of the path rules.
+        :param netloc: The netloc of the host.
+        :return: The rules of its domain, or None if it is not crawled.
+        """
+        try:
+            return self._by_netloc[netloc]
+        except KeyError:
+            pass
+        domain = self._domains.get(netloc)
+        if domain is None:
+            parts = netloc.split(".")
+            for start in range(1, len(parts) - 1):
+                parent = self._domains.get(".".join(parts[start:]))
+                if parent and parent.include_subdomains:
+                    domain = parent
+                    break
+        if len(self._by_netloc) >= _MAX_CACHED_NETLOCS:
+            self._by_netloc.clear()
+        self._by_netloc[netloc] = domain
+        return domain
+
+    def __contains__(self, url: str) -> bool:
+        return self.domain_of(url) is not None
@@ -0,0 +1,258 @@
+import math
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from hashlib import blake2b
+from typing import Iterable, Iterator
+
+# Fingerprint 0 marks an empty slot in the hash table, so it is remapped to 1.
+_EMPTY = 0
+_MAX_LOAD_FACTOR = 0.5
+
+
+def _fingerprint(url: str) -> int:
+    """
+    Hash a URL to a 64-bit fingerprint.
+    :param url: The URL to hash.
+    :return: The fingerprint, never 0.
+    """
+    fingerprint = int.from_bytes(blake2b(url.encode(), digest_size=8).digest(), "little")
+    return fingerprint or 1
+
+
+def _bloom_hashes(url: str) -> tuple[int, int]:
+    """
+    Hash a URL to the two 64-bit hashes the bloom filter positions are derived from.
+    :param url: The URL to hash.
+    :return: The two hashes. The second one is odd, so it can be used as a stride.
+    """
+    digest = blake2b(url.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class SeenUrlStore(ABC):
+    """
+    SeenUrlStore keeps track of the URLs the frontier has already seen.
+    Implementations trade exactness for memory, which matters on crawls of millions of URLs.
+    """
+
+    @abstractmethod
+    def add(self, url: str) -> bool:
+        """
+        Add a URL to the store.
+        :param url: The normalized URL.
+        :return: True if the URL was not seen before, False otherwise.
+        """
+
+    def add_many(self, urls: Iterable[str]) -> list[str]:
+        """
+        Add many URLs to the store in one pass, e.g. all the links of a page.
+        :param urls: The normalized URLs.
+        :return: The URLs not seen before, in order and without duplicates.
+        """
+        return [url for url in urls if self.add(url)]
+
+    @abstractmethod
+    def __contains__(self, url: str) -> bool: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def memory_bytes(self) -> int:
+        """
+        Get the memory used by the store.
+        :return: The approximate memory used, in bytes.
+        """
+
+    def bytes_per_url(self) -> float:
+        """
+        Get the memory used per URL, to size crawl workers.
+        :return: The approximate memory used per URL seen, in bytes.
+        """
+        return self.memory_bytes() / len(self) if len(self) else 0.0
+
+
+class ExactSeenStore(SeenUrlStore):
+    """
+    ExactSeenStore keeps the full URLs in a set. It never gives a wrong answer, but is the most memory hungry.
+    """
+
+    def __init__(self) -> None:
+        self._urls: set[str] = set()
+        self._urls_bytes = 0
+
+    def add(self, url: str) -> bool:
+        if url in self._urls:
+            return False
+        self._urls.add(url)
+        self._urls_bytes += sys.getsizeof(url)
+        return True
+
+    def add_many(self, urls: Iterable[str]) -> list[str]:
+        new_urls = [url for url in dict.fromkeys(urls) if url not in self._urls]
+        self._urls.update(new_urls)
+        self._urls_bytes += sum(map(sys.getsizeof, new_urls))
+        return new_urls
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._urls)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._urls) + self._urls_bytes
+
+
+class FingerprintSeenStore(SeenUrlStore):
+    """
+    FingerprintSeenStore keeps a 64-bit hash of each URL in an open-addressing hash table backed by an array.
+    It uses 16 to 32 bytes per URL, whatever the URL length. Two URLs sharing a fingerprint would be mistaken for one
+    another, but with 64-bit hashes the odds are about one in a million even after ten million URLs.
+    """
+
+    def __init__(self, initial_capacity: int = 1024) -> None:
+        """
+        Initialize the FingerprintSeenStore.
+        :param initial_capacity: The initial number of slots of the table. It doubles whenever it is half full.
+        """
+        self._table = array("Q", bytes(8 * max(8, 1 << (initial_capacity - 1).bit_length())))
+        self._mask = len(self._table) - 1
+        self._size = 0
+
+    def add(self, url: str) -> bool:
+        fingerprint = _fingerprint(url)
+        slot = self._find_slot(fingerprint)
+        if self._table[slot] == fingerprint:
+            return False
+        self._table[slot] = fingerprint
+        self._size += 1
+        if self._size > len(self._table) * _MAX_LOAD_FACTOR:
+            self._grow()
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        fingerprint = _fingerprint(url)
+        return self._table[self._find_slot(fingerprint)] == fingerprint
+
+    def __len__(self) -> int:
+        return self._size
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._table)
+
+    def _find_slot(self, fingerprint: int) -> int:
+        """
+        Find the slot holding the fingerprint, or the empty slot it would go in, using linear probing.
+        """
+        table, mask = self._table, self._mask
+        slot = fingerprint & mask
+        while table[slot] != _EMPTY and table[slot] != fingerprint:
+            slot = (slot + 1) & mask
+        return slot
+
+    def _grow(self) -> None:
+        old_table = self._table
+        self._table = array("Q", bytes(8 * len(old_table) * 2))
+        self._mask = len(self._table) - 1
+        for fingerprint in old_table:
+            if fingerprint != _EMPTY:
+                self._table[self._find_slot(fingerprint)] = fingerprint
+
+
+class _BloomFilter:
+    """
+    A fixed-size Bloom filter, sized for a capacity and false positive rate.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float) -> None:
+        bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.capacity = capacity
+        self.bits = max(8, bits)
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.size = 0
+
+    def positions(self, first: int, second: int) -> list[int]:
+        # Double hashing: the k bit positions are derived from two independent 64-bit hashes.
+        bits = self.bits
+        return [(first + i * second) % bits for i in range(self.hashes)]
+
+    def add(self, positions: list[int]) -> None:
+        array = self.array
+        for position in positions:
+            array[position >> 3] |= 1 << (position & 7)
+        self.size += 1
+
+    def contains(self, positions: list[int]) -> bool:
+        array = self.array
+        for position in positions:
+            if not array[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class BloomSeenStore(SeenUrlStore):
+    """
+    BloomSeenStore keeps URLs in a scalable Bloom filter, which uses about 10 bits per URL at a 1% false positive rate.
+    A false positive makes the frontier skip a URL it has never seen, but a URL is never crawled twice.
+    Once a filter is full, a new one twice as large and with half the false positive rate is added, so the overall rate
+    stays below the configured one however many URLs are seen.
+    """
+
+    def __init__(self, false_positive_rate: float = 0.01, initial_capacity: int = 100_000) -> None:
+        """
+        Initialize the BloomSeenStore.
+        :param false_positive_rate: The maximum rate at which unseen URLs are reported as seen.
+        :param initial_capacity: The number of URLs the first filter is sized for.
+        """
+        # The rates of the successive filters form a geometric series, summing to the configured rate.
+        self._next_false_positive_rate = false_positive_rate / 2
+        self._filters = [_BloomFilter(initial_capacity, self._next_false_positive_rate)]
+
+    def add(self, url: str) -> bool:
+        first, second = _bloom_hashes(url)
+        if self._contains(first, second):
+            return False
+        current = self._filters[-1]
+        if current.size >= current.capacity:
+            self._next_false_positive_rate /= 2
+            current = _BloomFilter(current.capacity * 2, self._next_false_positive_rate)
+            self._filters.append(current)
+        current.add(current.positions(first, second))
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self._contains(*_bloom_hashes(url))
+
+    def _contains(self, first: int, second: int) -> bool:
+        return any(bloom_filter.contains(bloom_filter.positions(first, second)) for bloom_filter in self._filters)
+
+    def __len__(self) -> int:
+        return sum(bloom_filter.size for bloom_filter in self._filters)
+
+    def memory_bytes(self) -> int:
+        return sum(sys.getsizeof(bloom_filter.array) for bloom_filter in self._filters)
+
+
+SEEN_STORES = ("exact", "fingerprint", "bloom")
+
+
+def create_seen_store(kind: str, false_positive_rate: float = 0.01) -> SeenUrlStore:
+    """
+    Create a seen-URL store.
+    :param kind: The kind of store, one of SEEN_STORES.
+    :param false_positive_rate: The false positive rate of the bloom store.
+    :return: The store.
+    """
+    if kind == "exact":
+        return ExactSeenStore()
+    if kind == "fingerprint":
+        return FingerprintSeenStore()
+    if kind == "bloom":
+        return BloomSeenStore(false_positive_rate)
+    raise ValueError(f"Unknown seen-URL store: {kind}")
@@ -0,0 +1,115 @@
+import csv
+import gzip
+import json
+import logging
+import sys
+from abc import ABC, abstractmethod
+from typing import TextIO
+
+_logger = logging.getLogger(__name__)
+
+# A recorded page: its URL and the links found on it.
+Record = tuple[str, set[str]]
+
+_STDOUT = "-"
+
+
+class ResultSink(ABC):
+    """
+    ResultSink is where the Reporter streams the recorded pages to.
+    Batches are written from a worker thread, one at a time, so implementations may block.
+    """
+
+    @abstractmethod
+    def write_batch(self, records: list[Record]) -> None:
+        """
+        Write a batch of recorded pages.
+        :param records: The pages and their links.
+        """
+
+    def close(self) -> None:
+        """
+        Flush and close the sink.
+        """
+
+
+class ConsoleSink(ResultSink):
+    """
+    ConsoleSink logs each page and its links with logger.info.
+    """
+
+    def write_batch(self, records: list[Record]) -> None:
+        for url, links in records:
+            lines = [f"URL: {url}", "Links:", *(f"  - {link}" for link in links), ""]
+            _logger.info("\n".join(lines))
+
+
+class _FileSink(ResultSink, ABC):
+    """
+    A sink writing to a file, gzip-compressed if its name ends with .gz, or to stdout if its name is "-".
+    """
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        """
+        Initialize the sink.
+        :param path: The path of the file, or "-" for stdout.
+        :param append: Whether to append to the file, e.g. when resuming a crawl, rather than overwrite it.
+        """
+        mode = "a" if append else "w"
+        if path == _STDOUT:
+            self._file: TextIO = sys.stdout
+        elif path.endswith(".gz"):
+            self._file = gzip.open(path, mode + "t", encoding="utf-8", newline="")
+        else:
+            # A large buffer, as the records are written in batches.
+            self._file = open(path, mode, encoding="utf-8", newline="", buffering=1024 * 1024)
+
+    def close(self) -> None:
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+
+class JsonlSink(_FileSink):
+    """
+    JsonlSink writes one JSON object per page: {"url": ..., "links": [...]}.
+    """
+
+    def write_batch(self, records: list[Record]) -> None:
+        self._file.write("".join(json.dumps({"url": url, "links": sorted(links)}) + "\n" for url, links in records))
+
+
+class CsvSink(_FileSink):
+    """
+    CsvSink writes one url,link row per link. Pages without links get a single row with an empty link.
+    """
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        super().__init__(path, append)
+        self._writer = csv.writer(self._file)
+        if not append:
+            self._writer.writerow(("url", "link"))
+
+    def write_batch(self, records: list[Record]) -> None:
+        self._writer.writerows((url, link) for url, links in records for link in (sorted(links) or [""]))
+
+
+SINK_FORMATS = ("console", "jsonl", "csv")
+
+
+def create_sink(output_format: str, path: str = _STDOUT, append: bool = False) -> ResultSink:
+    """
+    Create a result sink.
+    :param output_format: The format, one of SINK_FORMATS.
+    :param path: The file to write to, ending with .gz to compress it, or "-" for stdout. Ignored by the console sink.
+    :param append: Whether to append to the file rather than overwrite it.
+    :return: The sink.
+    """
+    if output_format == "console":
+        return ConsoleSink()
+    if output_format == "jsonl":
+        return JsonlSink(path, append)
+    if output_format == "csv":
+        return CsvSink(path, append)
+    raise ValueError(f"Unknown output format: {output_format}")
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import tempfile
+from typing import Iterable, Optional
+
+# A queued URL: (priority, sequence, url), as kept in the frontier's in-memory queues.
+QueueEntry = tuple[int, int, str]
+
+
+class SpillQueue:
+    """
+    SpillQueue holds the URLs that overflow the frontier's in-memory window, in an on-disk SQLite database.
+    URLs are written in batches, and paged back per host in priority order as the in-memory window drains.
+    """
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = 1000) -> None:
+        """
+        Initialize the SpillQueue.
+        :param path: The path of the database. Defaults to a temporary file, deleted on close.
+        :param batch_size: The number of URLs buffered in memory before they are written to disk.
+        """
+        self._temporary = path is None
+        if path is None:
+            file_descriptor, path = tempfile.mkstemp(prefix="frontier-", suffix=".sqlite")
+            os.close(file_descriptor)
+        self._path = path
+        self._batch_size = batch_size
+        self._buffer: list[tuple[str, int, int, str]] = []
+        self._counts: dict[str, int] = {}
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE IF NOT EXISTS queue (
+                host TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                sequence INTEGER NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS queue_order ON queue (host, priority, sequence);
+            """
+        )
+        for host, count in self._connection.execute("SELECT host, COUNT(*) FROM queue GROUP BY host"):
+            self._counts[host] = count
+
+    def push(self, host: str, entry: QueueEntry) -> None:
+        """
+        Add a URL to the queue.
+        :param host: The netloc of the URL.
+        :param entry: The queue entry of the URL.
+        """
+        self._buffer.append((host, *entry))
+        self._counts[host] = self._counts.get(host, 0) + 1
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+
+    def pop_many(self, host: str, limit: int) -> list[QueueEntry]:
+        """
+        Remove the highest priority URLs of a host from the queue.
+        :param host: The netloc of the host.
+        :param limit: The maximum number of URLs to remove.
+        :return: The queue entries, in priority order.
+        """
+        if not self._counts.get(host) or limit <= 0:
+            return []
+        self.flush()
+        with self._connection:
+            rows = self._connection.execute(
+                "SELECT rowid, priority, sequence, url FROM queue WHERE host = ? ORDER BY priority, sequence LIMIT ?",
+                (host, limit),
+            ).fetchall()
+            self._connection.executemany("DELETE FROM queue WHERE rowid = ?", ((row[0],) for row in rows))
+        self._counts[host] -= len(rows)
+        return [(priority, sequence, url) for _, priority, sequence, url in rows]
+
+    def count(self, host: str) -> int:
+        """
+        Get the number of URLs of a host in the queue.
+        :param host: The netloc of the host.
+        :return: The number of URLs.
+        """
+        return self._counts.get(host, 0)
+
+    def hosts(self) -> Iterable[str]:
+        """
+        Get the hosts with URLs in the queue.
+        """
+        return (host for host, count in self._counts.items() if count)
+
+    def flush(self) -> None:
+        """
+        Write the buffered URLs to disk.
+        """
+        if not self._buffer:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO queue (host, priority, sequence, url) VALUES (?, ?, ?, ?)", self._buffer
+            )
+        self._buffer.clear()
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def close(self) -> None:
+        """
+        Close the database, deleting it if it was temporary.
+        """
+        self._connection.close()
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self._path + suffix)
+                except FileNotFoundError:
+                    pass
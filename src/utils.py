@@ -1,6 +1,15 @@
-from urllib.parse import urlparse
+from functools import lru_cache
+from typing import Iterable
+from urllib.parse import urljoin, urlparse, urlsplit
 
+# The number of URLs memoised by normalize_url and resolve_url. Links such as the navigation menu appear on every page,
+# so most hrefs are resolved from the memo rather than parsed again.
+_MEMO_SIZE = 64 * 1024
+# The characters which end a URL's netloc, or an empty string, where it would be empty.
+_NETLOC_END = ("", "/", "?", "#")
 
+
+@lru_cache(maxsize=_MEMO_SIZE)
 def normalize_url(url: str) -> str:
     """
     Normalize a URL to avoid processing duplicates.
@@ -17,3 +26,64 @@ def normalize_url(url: str) -> str:
         scheme=scheme, netloc=netloc, fragment="", path=parsed_url.path.rstrip("/")
     )
     return normalized_url.geturl()
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def url_netloc(url: str) -> str:
+    """
+    Get the netloc (hostname + port) of a URL. Memoised, as the frontier checks the netloc of every link it is given.
+    :param url: The URL.
+    :return: The netloc.
+    """
+    return urlsplit(url).netloc
+
+
+def resolve_url(base_url: str, href: str) -> str:
+    """
+    Resolve an href against the URL of its page, and normalize it.
+    :param base_url: The base URL of the page.
+    :param href: The href attribute from an anchor tag.
+    :return: The normalized absolute URL.
+    """
+    return _resolve(_join_base(href, base_url, *_join_bases(base_url)), href)
+
+
+def resolve_urls(base_url: str, hrefs: Iterable[str]) -> set[str]:
+    """
+    Resolve and normalize all the hrefs of a page in one go.
+    :param base_url: The base URL of the page.
+    :param hrefs: The href attributes from the page's anchor tags.
+    :return: The set of normalized absolute URLs.
+    """
+    scheme_base, origin = _join_bases(base_url)
+    return {_resolve(_join_base(href, base_url, scheme_base, origin), href) for href in hrefs}
+
+
+@lru_cache(maxsize=1024)
+def _join_bases(base_url: str) -> tuple[str, str]:
+    """
+    Get the parts of a base URL which the resolution of an href may depend on.
+    :return: The base URL's scheme alone, and its origin.
+    """
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://", f"{parts.scheme}://{parts.netloc}"
+
+
+def _join_base(href: str, base_url: str, scheme_base: str, origin: str) -> str:
+    """
+    Reduce a base URL to the part the href is resolved against, so the same href on other pages hits the memo:
+    an href with a host only depends on the scheme, and an absolute-path href on the origin.
+    """
+    if href.startswith("/"):
+        if not href.startswith("//"):
+            return origin
+        if href[2:3] not in _NETLOC_END:
+            return scheme_base
+    elif href.startswith(("http://", "https://")) and href[href.index("//") + 2 :][:1] not in _NETLOC_END:
+        return scheme_base
+    return base_url
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _resolve(base_url: str, href: str) -> str:
+    return normalize_url(urljoin(base_url, href))
@@ -2,15 +2,18 @@ from unittest.mock import patch, AsyncMock
 
 import aiohttp
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from aioresponses import aioresponses
 
-from src.client.http_client import Client
+from src.client.http_client import Client, ConnectionConfig
+from src.client.response_cache import ResponseCache
 
 
 @pytest.fixture
 def client() -> Client:
     """Fixture to create a Client instance."""
-    return Client(allowed_netloc="example.com")
+    return Client(scope="example.com")
 
 
 async def test_fetch_success(client: Client) -> None:
@@ -23,11 +26,11 @@ async def test_fetch_success(client: Client) -> None:
         m.get(url, status=200, body=content, headers={"Content-Type": "text/html"})
 
         # Call the fetch method
-        final_url, fetched_content = await client.fetch(url)
+        result = await client.fetch(url)
 
         # Assertions
-        assert final_url == url
-        assert fetched_content == content
+        assert result.url == url
+        assert result.content == content
 
 
 async def test_fetch_non_html_content(client: Client) -> None:
@@ -40,11 +43,11 @@ async def test_fetch_non_html_content(client: Client) -> None:
         m.get(url, status=200, body=content, headers={"Content-Type": "image/png"})
 
         # Call the fetch method
-        final_url, fetched_content = await client.fetch(url)
+        result = await client.fetch(url)
 
         # Assertions
-        assert final_url is None
-        assert fetched_content is None
+        assert result.url is None
+        assert result.content is None
 
 
 async def test_fetch_http_error(client: Client) -> None:
@@ -56,11 +59,11 @@ async def test_fetch_http_error(client: Client) -> None:
         m.get(url, status=404)
 
         # Call the fetch method
-        final_url, fetched_content = await client.fetch(url)
+        result = await client.fetch(url)
 
         # Assertions
-        assert final_url is None
-        assert fetched_content is None
+        assert result.url is None
+        assert result.content is None
 
 
 async def test_fetch_network_error(client: Client) -> None:
@@ -72,11 +75,11 @@ async def test_fetch_network_error(client: Client) -> None:
         m.get(url, exception=aiohttp.ClientError("Network error"))
 
         # Call the fetch method
-        final_url, fetched_content = await client.fetch(url)
+        result = await client.fetch(url)
 
         # Assertions
-        assert final_url is None
-        assert fetched_content is None
+        assert result.url is None
+        assert result.content is None
 
 
 async def test_close_session(client: Client) -> None:
@@ -101,3 +104,110 @@ async def test_close_session(client: Client) -> None:
 
         # Assertions
         mock_session.close.assert_called_once()
+
+
+async def test_fetch_reports_response() -> None:
+    """Test the response callback is called once per request, with the status."""
+    responses = []
+    client = Client(scope="example.com", on_response=lambda *args: responses.append(args))
+
+    with aioresponses() as m:
+        m.get("https://example.com/page1", status=200, body="<html></html>", headers={"Content-Type": "text/html"})
+        m.get("https://example.com/throttled", status=429)
+        m.get("https://example.com/network-error", exception=aiohttp.ClientError("Network error"))
+
+        await client.fetch("https://example.com/page1")
+        await client.fetch("https://example.com/throttled")
+        await client.fetch("https://example.com/network-error")
+
+    await client.close()
+    assert [(url, status) for url, status, _ in responses] == [
+        ("https://example.com/page1", 200),
+        ("https://example.com/throttled", 429),
+        ("https://example.com/network-error", None),
+    ]
+
+
+async def test_fetch_not_modified_reuses_cached_links(tmp_path) -> None:
+    """Test a conditional GET answered with a 304 reuses the cached links."""
+    url = "https://example.com/page1"
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    client = Client(scope="example.com", cache=cache)
+
+    with aioresponses() as m:
+        m.get(url, status=200, body="<html></html>", headers={"Content-Type": "text/html", "ETag": '"v1"'})
+        m.get(url, status=304)
+
+        result = await client.fetch(url)
+        client.cache_links(url, {"https://example.com/page2"})
+        cached_result = await client.fetch(url)
+
+        # The second request was conditional
+        second_request = list(m.requests.values())[0][1]
+        assert second_request.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+    await client.close()
+    assert result.content == "<html></html>"
+    assert cached_result.content is None
+    assert cached_result.links == {"https://example.com/page2"}
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+async def test_fetch_reuses_connections() -> None:
+    """Test connections are kept alive and reused across requests, and that it is recorded."""
+
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{page}", handle)
+    async with TestServer(app) as server:
+        netloc = f"{server.host}:{server.port}"
+        client = Client(scope=netloc, connection_config=ConnectionConfig.for_workers(1))
+        await client.start()
+
+        await client.fetch(f"http://{netloc}/page1")
+        await client.fetch(f"http://{netloc}/page2")
+        await client.close()
+
+    assert client.stats.requests == 2
+    assert client.stats.connections_opened == 1
+    assert client.stats.connections_reused == 1
+    assert client.stats.summary()["avg_first_byte_ms"] > 0
+
+
+async def test_fetch_aborts_oversized_response() -> None:
+    """Test responses over the size cap are aborted, whether or not they announce their length."""
+    client = Client(scope="example.com", max_body_bytes=10)
+    body = "<html>" + "a" * 100 + "</html>"
+
+    with aioresponses() as m:
+        m.get("https://example.com/large", status=200, body=body, headers={"Content-Type": "text/html"})
+        m.get("https://example.com/small", status=200, body="<html/>", headers={"Content-Type": "text/html"})
+
+        large = await client.fetch("https://example.com/large")
+        small = await client.fetch("https://example.com/small")
+
+    await client.close()
+    assert large.content is None
+    assert small.content == "<html/>"
+    assert client.transfer_stats.oversized_aborted == 1
+
+
+async def test_fetch_head_precheck_skips_non_html() -> None:
+    """Test a URL with a non-HTML extension is checked with a HEAD request, and not downloaded if it isn't HTML."""
+    client = Client(scope="example.com", head_precheck=True)
+    url = "https://example.com/report.pdf"
+
+    with aioresponses() as m:
+        m.head(url, status=200, headers={"Content-Type": "application/pdf", "Content-Length": "1000"})
+
+        result = await client.fetch(url)
+
+        assert [method for method, _ in m.requests] == ["HEAD"]
+
+    await client.close()
+    assert result.content is None
+    assert client.transfer_stats.head_prechecks == 1
+    assert client.transfer_stats.bytes_saved == 1000
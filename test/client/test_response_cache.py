@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from src.client.response_cache import CacheEntry, ResponseCache
+
+
+def test_put_and_get(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+
+    cache.put("https://monzo.com", '"v1"', None, {"https://monzo.com/about"})
+
+    assert cache.get("https://monzo.com") == CacheEntry('"v1"', None, {"https://monzo.com/about"})
+    assert cache.get("https://monzo.com/about") is None
+    cache.close()
+
+
+def test_persists(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.put("https://monzo.com", None, "Wed, 21 Oct 2015 07:28:00 GMT", set())
+    cache.close()
+
+    reopened = ResponseCache(path)
+
+    assert reopened.get("https://monzo.com") == CacheEntry(None, "Wed, 21 Oct 2015 07:28:00 GMT", set())
+    assert reopened.size == cache.size
+    reopened.close()
+
+
+def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=150)
+    links = {"https://monzo.com/" + "a" * 20}
+
+    cache.put("https://monzo.com/1", '"v1"', None, links)
+    cache.put("https://monzo.com/2", '"v1"', None, links)
+    cache.touch("https://monzo.com/1")
+    cache.put("https://monzo.com/3", '"v1"', None, links)
+
+    assert cache.size <= 150
+    assert cache.get("https://monzo.com/2") is None
+    assert cache.get("https://monzo.com/1") is not None
+    assert cache.get("https://monzo.com/3") is not None
+    cache.close()
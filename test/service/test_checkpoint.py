@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from src.service.checkpoint import Checkpoint
+from src.service.frontier import Frontier
+from src.service.reporter import Reporter
+
+
+async def test_checkpoint_resume(tmp_path: Path) -> None:
+    path = str(tmp_path / "checkpoint.sqlite")
+    checkpoint = Checkpoint(path)
+    frontier = Frontier(scope="monzo.com", checkpoint=checkpoint)
+    reporter = Reporter(max_size=10, checkpoint=checkpoint)
+
+    await frontier.add_url("https://monzo.com")
+    await frontier.add_url("https://monzo.com/about")
+    await frontier.add_url("https://monzo.com/blog")
+    await reporter.record("https://monzo.com", {"https://monzo.com/about", "https://monzo.com/blog"})
+    await checkpoint.save()
+    # Changes after the last save are lost.
+    await frontier.add_url("https://monzo.com/unsaved")
+    checkpoint.close()
+
+    resumed = Checkpoint(path)
+    resumed_frontier = Frontier(scope="monzo.com")
+    resumed_reporter = Reporter(max_size=10)
+    resumed_frontier.restore(resumed)
+    resumed_reporter.restore(resumed)
+
+    assert resumed_reporter.results == {"https://monzo.com": {"https://monzo.com/about", "https://monzo.com/blog"}}
+    # The recorded page is not crawled again, but is still known as seen.
+    assert {await resumed_frontier.get_next_url(), await resumed_frontier.get_next_url()} == {
+        "https://monzo.com/about",
+        "https://monzo.com/blog",
+    }
+    assert not resumed_frontier.has_next()
+    await resumed_frontier.add_url("https://monzo.com")
+    assert not resumed_frontier.has_next()
+    resumed.close()
+
+
+async def test_checkpoint_save_without_changes(tmp_path: Path) -> None:
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.sqlite"))
+
+    await checkpoint.save()
+
+    assert list(checkpoint.pending()) == []
+    assert list(checkpoint.results()) == []
+    checkpoint.close()
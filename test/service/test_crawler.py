@@ -1,9 +1,11 @@
-import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from src.client.http_client import FetchResult
+from src.metrics import MetricsRegistry
 from src.service.crawler import Crawler
+from src.service.page_budget import PageBudget
 
 
 class TestException(Exception):
@@ -15,7 +17,7 @@ class TestException(Exception):
 def mock_frontier() -> MagicMock:
     frontier = MagicMock()
     frontier.get_next_url = AsyncMock()
-    frontier.add_url = AsyncMock()
+    frontier.add_urls = AsyncMock()
     return frontier
 
 
@@ -30,17 +32,17 @@ def mock_client() -> MagicMock:
 def mock_reporter() -> MagicMock:
     reporter = MagicMock()
     reporter.results = {}
-    reporter.record = MagicMock()
+    reporter.record = AsyncMock()
     return reporter
 
 
 @pytest.fixture
-def max_pages_reached() -> asyncio.Event:
-    return asyncio.Event()
+def budget() -> PageBudget:
+    return PageBudget(max_pages=5)
 
 
 async def test_crawler_runs_successfully(
-        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, max_pages_reached: asyncio.Event
+        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, budget: PageBudget
 ) -> None:
     # Mock behavior
     mock_frontier.get_next_url.side_effect = [
@@ -49,8 +51,8 @@ async def test_crawler_runs_successfully(
         None,  # Simulate empty queue
     ]
     mock_client.fetch.side_effect = [
-        ("https://example.com/page1", """<html><a href="https://example.com/page3">Link</a></html>"""),
-        ("https://example.com/page2", """<html><a href="https://example.com/page4">Link</a></html>"""),
+        FetchResult("https://example.com/page1", """<html><a href="https://example.com/page3">Link</a></html>"""),
+        FetchResult("https://example.com/page2", """<html><a href="https://example.com/page4">Link</a></html>"""),
     ]
     mock_reporter.results = {}  # Start with no results
 
@@ -59,23 +61,22 @@ async def test_crawler_runs_successfully(
         frontier=mock_frontier,
         client=mock_client,
         reporter=mock_reporter,
-        max_pages_reached=max_pages_reached,
-        max_pages=5,
+        budget=budget,
     )
 
     # Run the crawler
     await crawler.run()
 
     # Assertions
-    assert not max_pages_reached.is_set()
+    assert not budget.exhausted.is_set()
     assert mock_frontier.get_next_url.call_count == 3  # Two pages + None
     assert mock_client.fetch.call_count == 2
     assert mock_reporter.record.call_count == 2
-    assert mock_frontier.add_url.call_count == 2
+    assert mock_frontier.add_urls.call_count == 2
 
 
 async def test_crawler_stops_at_max_pages(
-        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, max_pages_reached: asyncio.Event
+        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, budget: PageBudget
 ) -> None:
     # Mock behavior
     urls = [f"https://example.com/page{i}" for i in range(5)]
@@ -86,7 +87,7 @@ async def test_crawler_stops_at_max_pages(
         {"".join(f'<a href="{url}"></a>' for url in urls)}
     </html>
     """
-    mock_client.fetch.return_value = ("https://example.com", content)
+    mock_client.fetch.return_value = FetchResult("https://example.com", content)
 
     mock_frontier.get_next_url.side_effect = urls
 
@@ -100,8 +101,7 @@ async def test_crawler_stops_at_max_pages(
         frontier=mock_frontier,
         client=mock_client,
         reporter=mock_reporter,
-        max_pages_reached=max_pages_reached,
-        max_pages=max_pages,
+        budget=PageBudget(max_pages),
     )
 
     # Run the crawler
@@ -110,10 +110,12 @@ async def test_crawler_stops_at_max_pages(
     # Check the reporter only has the right number of pages
     assert mock_reporter.record.call_count == max_pages
     assert len(mock_reporter.results) == max_pages
+    # No page is fetched over the budget
+    assert mock_client.fetch.call_count == max_pages
 
 
 async def test_crawler_processes_until_queue_empty(
-        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, max_pages_reached: asyncio.Event
+        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, budget: PageBudget
 ) -> None:
     # Mock behavior
     mock_frontier.get_next_url.side_effect = [
@@ -121,7 +123,7 @@ async def test_crawler_processes_until_queue_empty(
         "https://example.com/page2",
         None,  # Simulate empty queue
     ]
-    mock_client.fetch.return_value = ("https://example.com/page1", "<html>...</html>")
+    mock_client.fetch.return_value = FetchResult("https://example.com/page1", "<html>...</html>")
     mock_reporter.results = {}  # Start with no results
 
     crawler = Crawler(
@@ -129,21 +131,20 @@ async def test_crawler_processes_until_queue_empty(
         frontier=mock_frontier,
         client=mock_client,
         reporter=mock_reporter,
-        max_pages_reached=max_pages_reached,
-        max_pages=5,
+        budget=budget,
     )
     # Run crawler
     await crawler.run()
 
     # Assertions
-    assert not max_pages_reached.is_set()
+    assert not budget.exhausted.is_set()
     assert mock_frontier.get_next_url.call_count == 3
     mock_client.fetch.assert_called()
     mock_reporter.record.assert_called()
 
 
 async def test_crawler_handles_unexpected_fetch_errors(
-        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, max_pages_reached: asyncio.Event
+        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, budget: PageBudget
 ) -> None:
     # Mock behavior
     mock_frontier.get_next_url.return_value = "https://example.com/page1"
@@ -157,10 +158,88 @@ async def test_crawler_handles_unexpected_fetch_errors(
             frontier=mock_frontier,
             client=mock_client,
             reporter=mock_reporter,
-            max_pages_reached=max_pages_reached,
-            max_pages=5,
+            budget=budget,
         ).run()
 
     # Assertions
     mock_reporter.record.assert_not_called()  # Ensure record was not called
-    mock_frontier.add_url.assert_not_called()  # Ensure no links were added
+    mock_frontier.add_urls.assert_not_called()  # Ensure no links were added
+
+
+async def test_crawler_reuses_cached_links(
+        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock, budget: PageBudget
+) -> None:
+    # Mock behavior
+    mock_frontier.get_next_url.side_effect = ["https://example.com/page1", None]
+    cached_links = {"https://example.com/page2"}
+    mock_client.fetch.return_value = FetchResult("https://example.com/page1", None, cached_links)
+
+    crawler = Crawler(
+        worker_id=1,
+        frontier=mock_frontier,
+        client=mock_client,
+        reporter=mock_reporter,
+        budget=budget,
+    )
+    # Run crawler
+    await crawler.run()
+
+    # Assertions
+    mock_reporter.record.assert_called_once_with("https://example.com/page1", cached_links)
+    mock_frontier.add_urls.assert_called_once_with(cached_links, normalized=True)
+    mock_client.cache_links.assert_not_called()  # The page was not parsed again
+
+
+async def test_crawler_releases_budget_on_failed_fetch(
+        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock
+) -> None:
+    # Mock behavior
+    mock_frontier.get_next_url.side_effect = ["https://example.com/error", "https://example.com/page1"]
+    mock_client.fetch.side_effect = [FetchResult(), FetchResult("https://example.com/page1", "<html></html>")]
+    budget = PageBudget(max_pages=1)
+
+    crawler = Crawler(
+        worker_id=1,
+        frontier=mock_frontier,
+        client=mock_client,
+        reporter=mock_reporter,
+        budget=budget,
+    )
+    # Run crawler
+    await crawler.run()
+
+    # Assertions
+    assert budget.exhausted.is_set()
+    assert budget.used == 1
+    mock_reporter.record.assert_called_once()
+    assert mock_frontier.task_done.call_count == 2
+
+
+async def test_crawler_records_metrics(
+        mock_frontier: MagicMock, mock_client: MagicMock, mock_reporter: MagicMock
+) -> None:
+    # Mock behavior
+    mock_frontier.get_next_url.side_effect = ["https://example.com/error", "https://example.com/page1", None]
+    mock_client.fetch.side_effect = [
+        FetchResult(),
+        FetchResult("https://example.com/page1", """<html><a href="https://example.com/page2">Link</a></html>"""),
+    ]
+    metrics = MetricsRegistry()
+
+    crawler = Crawler(
+        worker_id=1,
+        frontier=mock_frontier,
+        client=mock_client,
+        reporter=mock_reporter,
+        budget=PageBudget(max_pages=5),
+        metrics=metrics,
+    )
+    # Run crawler
+    await crawler.run()
+
+    # Assertions
+    assert metrics.value("pages_crawled_total") == 1
+    assert metrics.value("pages_failed_total") == 1
+    assert metrics.value("links_found_total") == 1
+    assert metrics.get("parse_seconds").count == 1
+    assert metrics.get("worker_idle_seconds_total", {"worker": "1"}).value >= 0
@@ -1,10 +1,15 @@
+import asyncio
+
 import pytest
 
+from src.metrics import MetricsRegistry
 from src.service.frontier import Frontier
+from src.service.politeness import PolitenessScheduler
+from src.service.scope import CrawlScope, DomainRules
 
 
 @pytest.mark.parametrize(
-    "url, expected, allowed_netloc",
+    "url, expected, scope",
     [
         ("https://monzo.com", "https://monzo.com", "monzo.com"),
         ("https://monzo.com/about", "https://monzo.com/about", "monzo.com"),
@@ -13,10 +18,8 @@ from src.service.frontier import Frontier
         ("https://monzo.com/about", None, None),
     ],
 )
-async def test_frontier(url: str, expected: str, allowed_netloc: str) -> None:
-    # We set the timeout to 1, the smallest possible value. This is not ideal as it still blocks the execution and
-    # makes the test slower.
-    frontier = Frontier(allowed_netloc=allowed_netloc, timeout=1)
+async def test_frontier(url: str, expected: str, scope: str) -> None:
+    frontier = Frontier(scope=scope)
 
     await frontier.add_url(url)
 
@@ -24,6 +27,164 @@ async def test_frontier(url: str, expected: str, allowed_netloc: str) -> None:
 
     assert await frontier.get_next_url() == expected
     expected_visited = [expected] if expected else []
-    assert frontier._visited == set(expected_visited)
+    assert set(frontier._visited) == set(expected_visited)
+
+    assert not frontier.has_next()
+
+
+async def test_frontier_priority() -> None:
+    frontier = Frontier(scope="monzo.com")
+
+    await frontier.add_url("https://monzo.com/deep", priority=2)
+    await frontier.add_url("https://monzo.com/shallow", priority=0)
+    await frontier.add_url("https://monzo.com/shallow-too", priority=0)
+
+    assert await frontier.get_next_url() == "https://monzo.com/shallow"
+    assert await frontier.get_next_url() == "https://monzo.com/shallow-too"
+
+
+async def test_frontier_waits_for_host_slot() -> None:
+    scheduler = PolitenessScheduler(initial_concurrency=1)
+    frontier = Frontier(scope="monzo.com", scheduler=scheduler)
+    await frontier.add_url("https://monzo.com/page1")
+    await frontier.add_url("https://monzo.com/page2")
+
+    url = await frontier.get_next_url()
+    waiter = asyncio.create_task(frontier.get_next_url())
+    await asyncio.sleep(0.01)
+    # The host only allows one request at a time, so the second URL is held back until the first is done.
+    assert not waiter.done()
+
+    frontier.task_done(url)
+    assert await waiter == "https://monzo.com/page2"
+
+
+async def test_frontier_min_delay() -> None:
+    scheduler = PolitenessScheduler(min_delay=0.1, initial_concurrency=2)
+    frontier = Frontier(scope="monzo.com", scheduler=scheduler)
+    await frontier.add_url("https://monzo.com/page1")
+    await frontier.add_url("https://monzo.com/page2")
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await frontier.get_next_url()
+    await frontier.get_next_url()
+
+    assert loop.time() - start >= 0.1
+
+
+async def test_frontier_spills_to_disk() -> None:
+    frontier = Frontier(scope="monzo.com", max_in_memory=2)
+    urls = [f"https://monzo.com/page{i}" for i in range(5)]
+    for url in urls:
+        await frontier.add_url(url)
+
+    # Only the in-memory window is held in memory, the rest has been spilled.
+    assert frontier._in_memory == 2
+    assert frontier.has_next()
+
+    crawled = []
+    while frontier.has_next():
+        url = await frontier.get_next_url()
+        crawled.append(url)
+        frontier.task_done(url)
+        assert frontier._in_memory <= 2
+
+    assert crawled == urls
+    frontier.close()
+
+
+async def test_frontier_add_urls() -> None:
+    frontier = Frontier(scope="monzo.com")
+    await frontier.add_url("https://monzo.com/seen")
+
+    added = await frontier.add_urls(
+        ["https://monzo.com/a/", "https://monzo.com/seen", "https://example.com/b", "https://monzo.com/a#top"]
+    )
+
+    assert added == 1
+    assert await frontier.get_next_url() == "https://monzo.com/seen"
+    assert await frontier.get_next_url() == "https://monzo.com/a"
+    assert not frontier.has_next()
+
+
+async def test_frontier_waits_for_pages_in_flight() -> None:
+    frontier = Frontier(scope="monzo.com")
+    await frontier.add_url("https://monzo.com")
+    url = await frontier.get_next_url()
+
+    waiter = asyncio.create_task(frontier.get_next_url())
+    await asyncio.sleep(0.01)
+    # The queue is empty, but the page in flight may still add links.
+    assert not waiter.done()
+
+    await frontier.add_url("https://monzo.com/about")
+    frontier.task_done(url)
+    assert await waiter == "https://monzo.com/about"
+
+
+async def test_frontier_stops_when_quiescent() -> None:
+    frontier = Frontier(scope="monzo.com")
+    await frontier.add_url("https://monzo.com")
+    url = await frontier.get_next_url()
+    waiters = [asyncio.create_task(frontier.get_next_url()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    frontier.task_done(url)
+
+    # Every waiting worker stops as soon as the last page is done, without waiting for a timeout.
+    assert await asyncio.wait_for(asyncio.gather(*waiters), timeout=0.1) == [None, None, None]
+
+
+async def test_frontier_metrics() -> None:
+    metrics = MetricsRegistry()
+    frontier = Frontier(scope="monzo.com", metrics=metrics)
+
+    await frontier.add_urls(["https://monzo.com/a", "https://monzo.com/b"])
+    await frontier.add_urls(["https://monzo.com/a", "https://monzo.com/c", "https://example.com"])
+
+    assert metrics.value("urls_offered_total") == 4
+    assert metrics.value("urls_added_total") == 3
+    assert metrics.value("dedupe_hit_rate") == 0.25
+    assert metrics.value("queue_depth") == 3
+
+
+async def test_frontier_takes_turns_across_domains() -> None:
+    scope = CrawlScope([DomainRules("monzo.com"), DomainRules("example.com")])
+    frontier = Frontier(scope=scope)
+    await frontier.add_urls([f"https://monzo.com/page{i}" for i in range(3)])
+    await frontier.add_urls([f"https://example.com/page{i}" for i in range(3)])
+    await frontier.add_url("https://other.com/page")
+
+    urls = [await frontier.get_next_url() for _ in range(6)]
+
+    # A domain with many URLs queued doesn't hold the others back.
+    assert [url.split("/")[2] for url in urls] == ["monzo.com", "example.com"] * 3
+    assert not frontier.has_next()
+
+
+async def test_frontier_domain_page_limit() -> None:
+    metrics = MetricsRegistry()
+    scope = CrawlScope([DomainRules("monzo.com", max_pages=2), DomainRules("example.com")])
+    frontier = Frontier(scope=scope, metrics=metrics)
+    await frontier.add_urls([f"https://monzo.com/page{i}" for i in range(5)])
+    await frontier.add_url("https://example.com/")
+
+    first = await frontier.get_next_url()
+    frontier.task_done(first, crawled=False)
+    dispatched = [await frontier.get_next_url() for _ in range(3)]
+    assert [url.split("/")[2] for url in dispatched] == ["example.com", "monzo.com", "monzo.com"]
+    # Two pages of monzo.com are in flight, so no more are dispatched until they are done.
+    waiter = asyncio.create_task(frontier.get_next_url())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
 
+    for url in dispatched:
+        frontier.task_done(url)
+    # The URLs still queued on monzo.com are dropped, and new ones are ignored.
+    assert await waiter is None
+    await frontier.add_url("https://monzo.com/new")
     assert not frontier.has_next()
+    snapshot = metrics.snapshot()
+    assert snapshot["domain_pages_crawled_total"] == {"monzo.com": 2, "example.com": 1}
+    assert snapshot["domain_pages_failed_total"] == {"monzo.com": 1, "example.com": 0}
@@ -0,0 +1,86 @@
+import pytest
+
+from src.service.link_graph import LinkGraph, LinkGraphResults
+
+HOME = "https://monzo.com"
+ABOUT = "https://monzo.com/about"
+BLOG = "https://monzo.com/blog"
+CAREERS = "https://monzo.com/careers"
+
+
+@pytest.fixture
+def graph() -> LinkGraph:
+    graph = LinkGraph()
+    graph.add_page(HOME, {ABOUT, BLOG})
+    graph.add_page(ABOUT, {HOME, ABOUT, BLOG})
+    graph.add_page(CAREERS, {HOME})
+    return graph
+
+
+def test_urls_are_interned_once(graph: LinkGraph) -> None:
+    assert graph.node_count == 4
+    assert graph.page_count == 3
+    assert graph.edge_count == 6
+    assert graph.intern(BLOG) == graph.intern(BLOG)
+
+
+def test_links(graph: LinkGraph) -> None:
+    assert graph.links(HOME) == {ABOUT, BLOG}
+    assert graph.links(CAREERS) == {HOME}
+    assert list(graph.pages()) == [HOME, ABOUT, CAREERS]
+    assert graph.has_page(ABOUT)
+    assert not graph.has_page(BLOG)  # Linked to, but not recorded
+
+
+def test_in_degrees(graph: LinkGraph) -> None:
+    degrees = graph.in_degrees()
+
+    assert degrees[graph.intern(HOME)] == 2
+    assert degrees[graph.intern(BLOG)] == 2
+    assert degrees[graph.intern(CAREERS)] == 0
+    assert graph.top_linked(1)[0][1] == 2
+
+
+def test_orphans_ignore_self_links(graph: LinkGraph) -> None:
+    graph.add_page("https://monzo.com/lonely", {"https://monzo.com/lonely"})
+
+    assert graph.orphans() == [CAREERS, "https://monzo.com/lonely"]
+
+
+def test_binary_export_round_trip(graph: LinkGraph, tmp_path) -> None:
+    path = str(tmp_path / "graph.bin")
+    graph.export_binary(path)
+
+    loaded = LinkGraph.load(path)
+
+    assert dict(LinkGraphResults(loaded)) == dict(LinkGraphResults(graph))
+    assert loaded.node_count == graph.node_count
+
+
+def test_load_rejects_other_files(tmp_path) -> None:
+    path = tmp_path / "graph.bin"
+    path.write_bytes(b"not a graph" * 10)
+
+    with pytest.raises(ValueError):
+        LinkGraph.load(str(path))
+
+
+def test_edge_list_export(graph: LinkGraph, tmp_path) -> None:
+    path = str(tmp_path / "graph.txt")
+    graph.export_edge_list(path)
+
+    urls = open(path + ".nodes").read().splitlines()
+    edges = {tuple(urls[int(node)] for node in line.split()) for line in open(path).read().splitlines()}
+
+    assert len(edges) == graph.edge_count
+    assert (CAREERS, HOME) in edges
+
+
+def test_results_view(graph: LinkGraph) -> None:
+    results = LinkGraphResults(graph)
+
+    assert len(results) == 3
+    assert results[HOME] == {ABOUT, BLOG}
+    assert BLOG not in results
+    with pytest.raises(KeyError):
+        results[BLOG]
@@ -0,0 +1,52 @@
+import asyncio
+
+from src.service.page_budget import PageBudget
+
+
+async def test_reserve_up_to_budget() -> None:
+    budget = PageBudget(max_pages=2)
+
+    assert await budget.reserve()
+    assert await budget.reserve()
+    budget.commit()
+    budget.commit()
+
+    assert budget.exhausted.is_set()
+    assert not await budget.reserve()
+    assert budget.used == 2
+
+
+async def test_reserve_waits_for_in_flight_pages() -> None:
+    budget = PageBudget(max_pages=1)
+    assert await budget.reserve()
+
+    # Every slot is reserved, so the next reservation waits to see whether the in-flight page succeeds.
+    waiter = asyncio.create_task(budget.reserve())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    # The page failed, so its slot is handed to the waiting worker.
+    budget.release()
+    assert await waiter
+
+    # This one succeeded, so the budget is used up.
+    budget.commit()
+    assert budget.exhausted.is_set()
+
+
+async def test_reserve_stops_when_budget_is_used_up() -> None:
+    budget = PageBudget(max_pages=1)
+    assert await budget.reserve()
+    waiter = asyncio.create_task(budget.reserve())
+    await asyncio.sleep(0)
+
+    budget.commit()
+
+    assert not await waiter
+
+
+async def test_resumed_budget() -> None:
+    budget = PageBudget(max_pages=2, used=2)
+
+    assert budget.exhausted.is_set()
+    assert not await budget.reserve()
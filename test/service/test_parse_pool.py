@@ -0,0 +1,29 @@
+import pytest
+
+from src.service.parse_pool import ParsePool
+from src.service.parser import parse
+
+
+@pytest.fixture
+async def parse_pool() -> ParsePool:
+    pool = ParsePool(processes=1)
+    yield pool
+    await pool.close()
+
+
+async def test_parse_pool_matches_inline_parse(parse_pool: ParsePool) -> None:
+    html = """
+    <a href="/blog/">Blog</a>
+    <a href="https://example.com/">Example</a>
+    <a href="mailto:monzo@gmail.com">Mail</a>
+    """
+
+    links = await parse_pool.parse("https://monzo.com", html)
+
+    assert links == parse("https://monzo.com", html)
+
+
+async def test_parse_pool_no_links(parse_pool: ParsePool) -> None:
+    links = await parse_pool.parse("https://monzo.com", "<html></html>")
+
+    assert links == set()
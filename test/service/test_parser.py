@@ -1,6 +1,8 @@
+from pathlib import Path
+
 import pytest
 
-from src.service.parser import parse
+from src.service.parser import PARSERS, LinkExtractor, parse, parse_streaming
 
 
 @pytest.mark.parametrize(
@@ -19,3 +21,38 @@ def test_parse(base_url: str, link: str, expected: str) -> None:
 
     links = parse(base_url, html)
     assert links == expected
+
+
+_FIXTURES = Path(__file__).parent / "fixtures" / "parser"
+
+
+@pytest.mark.parametrize("fixture", sorted(_FIXTURES.glob("*.html")), ids=lambda path: path.name)
+def test_parse_streaming_matches_parse(fixture: Path) -> None:
+    html = fixture.read_text()
+
+    assert parse_streaming("https://monzo.com/page", html) == parse("https://monzo.com/page", html)
+
+
+@pytest.mark.parametrize("engine", sorted(PARSERS))
+def test_parse_honours_base_href(engine: str) -> None:
+    html = """
+    <head><base href="https://docs.monzo.com/guide/"></head>
+    <body><a href="/cards/">Cards</a></body>
+    """
+
+    links = PARSERS[engine]("https://monzo.com", html)
+    assert links == {"https://docs.monzo.com/cards"}
+
+
+def test_link_extractor_streams_chunks() -> None:
+    found = []
+    extractor = LinkExtractor("https://monzo.com", on_link=found.append)
+    html = '<body><a href="/blog/">Blog</a><a href="/about">About</a><a href="/blog">Blog again</a></body>'
+
+    # Split the document in the middle of a tag to check links are still found across chunk boundaries.
+    extractor.feed(html[:20])
+    extractor.feed(html[20:])
+    links = extractor.close()
+
+    assert found == ["https://monzo.com/blog", "https://monzo.com/about"]
+    assert links == {"https://monzo.com/blog", "https://monzo.com/about"}
@@ -0,0 +1,77 @@
+import math
+
+from src.service.politeness import PolitenessScheduler
+
+_HOST = "monzo.com"
+
+
+def test_min_delay_between_requests() -> None:
+    scheduler = PolitenessScheduler(min_delay=2.0, initial_concurrency=4)
+
+    assert scheduler.ready_at(_HOST) == 0.0
+    scheduler.on_dispatch(_HOST, now=10.0)
+
+    assert scheduler.ready_at(_HOST) == 12.0
+
+
+def test_concurrency_limit() -> None:
+    scheduler = PolitenessScheduler(initial_concurrency=1)
+
+    scheduler.on_dispatch(_HOST, now=0.0)
+    assert scheduler.ready_at(_HOST) == math.inf
+
+    scheduler.on_done(_HOST)
+    assert scheduler.ready_at(_HOST) == 0.0
+
+
+def test_concurrency_grows_while_host_is_fast() -> None:
+    scheduler = PolitenessScheduler(initial_concurrency=1, max_concurrency=3)
+
+    for i in range(20):
+        scheduler.on_response(_HOST, 200, latency=0.1, now=float(i))
+
+    assert scheduler.concurrency(_HOST) == 3
+
+
+def test_backs_off_when_throttled() -> None:
+    scheduler = PolitenessScheduler(initial_concurrency=4, max_concurrency=4)
+
+    scheduler.on_response(_HOST, 429, latency=0.1, now=0.0)
+
+    assert scheduler.concurrency(_HOST) == 2
+    assert scheduler.delay(_HOST) >= 1.0
+    assert scheduler.ready_at(_HOST) >= scheduler.delay(_HOST)
+
+
+def test_backs_off_when_host_slows_down() -> None:
+    scheduler = PolitenessScheduler(initial_concurrency=4, max_concurrency=4, latency_smoothing=1.0)
+
+    scheduler.on_response(_HOST, 200, latency=0.1, now=0.0)
+    scheduler.on_response(_HOST, 200, latency=1.0, now=1.0)
+
+    assert scheduler.concurrency(_HOST) == 2
+    # A slow host is given fewer concurrent requests, but isn't delayed as if it had throttled us.
+    assert scheduler.delay(_HOST) == 0.0
+
+
+def test_set_min_delay() -> None:
+    scheduler = PolitenessScheduler()
+
+    scheduler.set_min_delay(_HOST, 5.0)
+
+    assert scheduler.delay(_HOST) == 5.0
+    # Other hosts are not affected.
+    assert scheduler.delay("example.com") == 0.0
+
+
+def test_set_max_concurrency() -> None:
+    scheduler = PolitenessScheduler(initial_concurrency=4, max_concurrency=8)
+
+    scheduler.set_max_concurrency(_HOST, 2)
+    assert scheduler.concurrency(_HOST) == 2
+
+    for i in range(20):
+        scheduler.on_response(_HOST, 200, latency=0.1, now=float(i))
+    # The concurrency no longer grows past the host's own limit.
+    assert scheduler.concurrency(_HOST) == 2
+    assert scheduler.concurrency("example.com") == 4
@@ -3,28 +3,28 @@ from _pytest.logging import LogCaptureFixture
 from src.service.reporter import Reporter
 
 
-def test_record_new_url() -> None:
+async def test_record_new_url() -> None:
     reporter = Reporter(max_size=10)
 
     url = "http://example.com"
     links = {"http://example.com/page1", "http://example.com/page2"}
 
-    reporter.record(url, links)
+    await reporter.record(url, links)
 
     assert url in reporter.results
     assert reporter.results[url] == links
 
 
-def test_record_new_url_max_size_reached() -> None:
+async def test_record_new_url_max_size_reached() -> None:
     max_size = 1
     reporter = Reporter(max_size=max_size)
 
     url = "http://example.com"
     links = {"http://example.com/page1", "http://example.com/page2"}
-    reporter.record(url, links)
+    await reporter.record(url, links)
 
     url2 = "http://example.com/page1"
-    reporter.record(url2, links)
+    await reporter.record(url2, links)
 
     assert len(reporter.results) == max_size
     assert url in reporter.results
@@ -32,12 +32,12 @@ def test_record_new_url_max_size_reached() -> None:
     assert url2 not in reporter.results
 
 
-def test_output(caplog: LogCaptureFixture) -> None:
+async def test_output(caplog: LogCaptureFixture) -> None:
     reporter = Reporter(max_size=10)
 
     url = "http://example.com"
     links = {"http://example.com/page1", "http://example.com/page2"}
-    reporter.record(url, links)
+    await reporter.record(url, links)
 
     with caplog.at_level("INFO"):
         reporter.output()
@@ -46,3 +46,15 @@ def test_output(caplog: LogCaptureFixture) -> None:
     assert "Links:" in caplog.text
     assert "  - http://example.com/page1" in caplog.text
     assert "  - http://example.com/page2" in caplog.text
+
+
+async def test_keep_graph_with_sink(tmp_path) -> None:
+    from src.service.sinks import JsonlSink
+
+    reporter = Reporter(max_size=10, sink=JsonlSink(str(tmp_path / "results.jsonl")), keep_graph=True)
+
+    await reporter.record("http://example.com", {"http://example.com/page1"})
+    await reporter.close()
+
+    assert reporter.results == {}
+    assert reporter.graph.links("http://example.com") == {"http://example.com/page1"}
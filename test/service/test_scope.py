@@ -0,0 +1,49 @@
+import pytest
+
+from src.service.scope import CrawlScope, DomainRules
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://monzo.com/about", "monzo.com"),
+        ("https://www.monzo.com/about", None),
+        ("https://example.com/blog/post", "example.com"),
+        ("https://example.com/about", None),
+        ("https://www.example.com/blog", "example.com"),
+        ("https://shop.www.example.com/blog", "example.com"),
+        ("https://other.com/blog", None),
+    ],
+)
+def test_domain_of(url: str, expected: str) -> None:
+    scope = CrawlScope(
+        [
+            DomainRules("monzo.com"),
+            DomainRules("example.com", path_prefix="/blog", include_subdomains=True),
+        ]
+    )
+
+    domain = scope.domain_of(url)
+
+    assert (domain.netloc if domain else None) == expected
+    assert (url in scope) == bool(expected)
+
+
+def test_from_seed() -> None:
+    url, rules = DomainRules.from_seed(
+        "https://Monzo.com/blog path_prefix=/blog include_subdomains=true max_pages=100 max_concurrency=4"
+    )
+
+    assert url == "https://Monzo.com/blog"
+    assert rules == DomainRules("monzo.com", "/blog", True, 100, 4)
+    assert DomainRules.from_seed("https://monzo.com") == ("https://monzo.com", DomainRules("monzo.com"))
+
+
+def test_from_seed_unknown_option() -> None:
+    with pytest.raises(ValueError):
+        DomainRules.from_seed("https://monzo.com depth=2")
+
+
+@pytest.mark.parametrize("scope, expected", [("monzo.com", ["monzo.com"]), ("", []), (None, [])])
+def test_of(scope: str, expected: list[str]) -> None:
+    assert [domain.netloc for domain in CrawlScope.of(scope).domains] == expected
@@ -0,0 +1,66 @@
+import pytest
+
+from src.service.seen_store import (
+    SEEN_STORES,
+    BloomSeenStore,
+    FingerprintSeenStore,
+    SeenUrlStore,
+    create_seen_store,
+)
+
+
+@pytest.mark.parametrize("kind", SEEN_STORES)
+def test_seen_store(kind: str) -> None:
+    store = create_seen_store(kind)
+
+    assert store.add("https://monzo.com/about")
+    assert not store.add("https://monzo.com/about")
+    assert "https://monzo.com/about" in store
+    assert "https://monzo.com/blog" not in store
+    assert len(store) == 1
+    assert store.bytes_per_url() > 0
+
+
+@pytest.mark.parametrize("kind", SEEN_STORES)
+def test_seen_store_add_many(kind: str) -> None:
+    store = create_seen_store(kind)
+    store.add("https://monzo.com/about")
+
+    new_urls = store.add_many(["https://monzo.com/blog", "https://monzo.com/about", "https://monzo.com/blog"])
+
+    assert new_urls == ["https://monzo.com/blog"]
+    assert len(store) == 2
+
+
+def test_fingerprint_store_grows() -> None:
+    store = FingerprintSeenStore(initial_capacity=8)
+    urls = [f"https://monzo.com/page{i}" for i in range(1000)]
+
+    assert all(store.add(url) for url in urls)
+    assert all(url in store for url in urls)
+    assert len(store) == len(urls)
+    # The table is kept at most half full, so it needs 16 to 32 bytes per URL.
+    assert 16 <= store.bytes_per_url() <= 33
+
+
+def test_bloom_store_false_positive_rate() -> None:
+    false_positive_rate = 0.01
+    store = BloomSeenStore(false_positive_rate, initial_capacity=1000)
+
+    # Go past the initial capacity, so the filter has to scale.
+    for i in range(5000):
+        store.add(f"https://monzo.com/page{i}")
+
+    false_positives = sum(f"https://monzo.com/other{i}" in store for i in range(10_000))
+    assert false_positives / 10_000 <= false_positive_rate * 1.5
+    assert store.bytes_per_url() < 4
+
+
+def test_create_unknown_store() -> None:
+    with pytest.raises(ValueError):
+        create_seen_store("unknown")
+
+
+def test_seen_store_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        SeenUrlStore()
@@ -0,0 +1,72 @@
+import csv
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from _pytest.logging import LogCaptureFixture
+
+from src.service.reporter import Reporter
+from src.service.sinks import SINK_FORMATS, ConsoleSink, CsvSink, JsonlSink, create_sink
+
+_RECORDS = [
+    ("http://example.com", {"http://example.com/page2", "http://example.com/page1"}),
+    ("http://example.com/page1", set()),
+]
+
+
+def test_jsonl_sink(tmp_path: Path) -> None:
+    path = tmp_path / "results.jsonl"
+    sink = JsonlSink(str(path))
+
+    sink.write_batch(_RECORDS)
+    sink.close()
+
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [
+        {"url": "http://example.com", "links": ["http://example.com/page1", "http://example.com/page2"]},
+        {"url": "http://example.com/page1", "links": []},
+    ]
+
+
+def test_compressed_csv_sink(tmp_path: Path) -> None:
+    path = tmp_path / "results.csv.gz"
+    sink = CsvSink(str(path))
+
+    sink.write_batch(_RECORDS)
+    sink.close()
+
+    with gzip.open(path, "rt", newline="") as file:
+        assert list(csv.reader(file)) == [
+            ["url", "link"],
+            ["http://example.com", "http://example.com/page1"],
+            ["http://example.com", "http://example.com/page2"],
+            ["http://example.com/page1", ""],
+        ]
+
+
+def test_console_sink(caplog: LogCaptureFixture) -> None:
+    with caplog.at_level("INFO"):
+        ConsoleSink().write_batch(_RECORDS)
+
+    assert "URL: http://example.com" in caplog.text
+    assert "  - http://example.com/page1" in caplog.text
+
+
+@pytest.mark.parametrize("output_format", SINK_FORMATS)
+def test_create_sink(output_format: str, tmp_path: Path) -> None:
+    sink = create_sink(output_format, str(tmp_path / "results"))
+    sink.close()
+
+
+async def test_reporter_streams_to_sink(tmp_path: Path) -> None:
+    path = tmp_path / "results.jsonl"
+    reporter = Reporter(max_size=10, sink=JsonlSink(str(path)), batch_size=2, max_pending_batches=1)
+
+    for i in range(5):
+        await reporter.record(f"http://example.com/page{i}", set())
+    await reporter.close()
+
+    # Nothing is kept in memory, and every record reached the sink.
+    assert reporter.results == {}
+    assert reporter.count == 5
+    assert len(path.read_text().splitlines()) == 5
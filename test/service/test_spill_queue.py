@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from src.service.spill_queue import SpillQueue
+
+
+def test_spill_queue_pops_in_priority_order() -> None:
+    spill_queue = SpillQueue(batch_size=2)
+
+    spill_queue.push("monzo.com", (1, 0, "https://monzo.com/deep"))
+    spill_queue.push("monzo.com", (0, 1, "https://monzo.com/shallow"))
+    spill_queue.push("example.com", (0, 2, "https://example.com"))
+
+    assert len(spill_queue) == 3
+    assert spill_queue.count("monzo.com") == 2
+    assert spill_queue.pop_many("monzo.com", 1) == [(0, 1, "https://monzo.com/shallow")]
+    assert spill_queue.pop_many("monzo.com", 10) == [(1, 0, "https://monzo.com/deep")]
+    assert spill_queue.pop_many("monzo.com", 10) == []
+    assert list(spill_queue.hosts()) == ["example.com"]
+
+    spill_queue.close()
+
+
+def test_spill_queue_persists(tmp_path: Path) -> None:
+    path = str(tmp_path / "queue.sqlite")
+    spill_queue = SpillQueue(path)
+    spill_queue.push("monzo.com", (0, 0, "https://monzo.com"))
+    spill_queue.flush()
+    spill_queue.close()
+
+    reopened = SpillQueue(path)
+
+    assert reopened.count("monzo.com") == 1
+    assert reopened.pop_many("monzo.com", 10) == [(0, 0, "https://monzo.com")]
+    reopened.close()
@@ -0,0 +1,82 @@
+import json
+
+import aiohttp
+import pytest
+
+from src.metrics import Counter, Histogram, MetricsRegistry, MetricsServer
+
+
+def test_counter_and_gauge() -> None:
+    registry = MetricsRegistry()
+    pages = registry.counter("pages_total", "The pages.")
+    queued = [1, 2, 3]
+    registry.gauge("queue_depth", "The queue depth.", fn=lambda: len(queued))
+
+    pages.inc()
+    pages.inc(2)
+    queued.append(4)
+
+    assert isinstance(pages, Counter)
+    assert registry.counter("pages_total", "The pages.") is pages
+    assert registry.value("pages_total") == 3
+    assert registry.value("queue_depth") == 4
+    assert registry.value("missing") == 0
+
+
+def test_histogram_quantiles() -> None:
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(16.5)
+    assert histogram.quantile(0.5) == pytest.approx(1.75)  # Interpolated within the (1, 2] bucket
+    assert histogram.quantile(1.0) == 4.0  # The unbounded bucket reports its lower bound
+    assert histogram.buckets() == [(1.0, 1), (2.0, 3), (4.0, 4), (float("inf"), 5)]
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_labelled_metrics_snapshot() -> None:
+    registry = MetricsRegistry()
+    registry.counter("idle_seconds_total", "The idle time.", {"worker": "1"}).inc(1.5)
+    registry.counter("idle_seconds_total", "The idle time.", {"worker": "2"}).inc(0.5)
+    registry.histogram("fetch_seconds", "The fetch time.").observe(0.02)
+
+    snapshot = json.loads(json.dumps(registry.snapshot()))
+
+    assert snapshot["idle_seconds_total"] == {"1": 1.5, "2": 0.5}
+    assert snapshot["fetch_seconds"]["count"] == 1
+    assert registry.value("idle_seconds_total") == 2.0
+
+
+def test_render_prometheus() -> None:
+    registry = MetricsRegistry()
+    registry.counter("pages_total", "The pages.", {"worker": "1"}).inc()
+    registry.histogram("fetch_seconds", "The fetch time.", buckets=(0.1, 1.0)).observe(0.5)
+
+    text = registry.render_prometheus()
+
+    assert "# HELP pages_total The pages.\n# TYPE pages_total counter\n" in text
+    assert 'pages_total{worker="1"} 1' in text
+    assert "# TYPE fetch_seconds histogram" in text
+    assert 'fetch_seconds_bucket{le="0.1"} 0' in text
+    assert 'fetch_seconds_bucket{le="1.0"} 1' in text
+    assert 'fetch_seconds_bucket{le="+Inf"} 1' in text
+    assert "fetch_seconds_count 1" in text
+
+
+async def test_metrics_server() -> None:
+    registry = MetricsRegistry()
+    registry.counter("pages_total", "The pages.").inc(7)
+    server = MetricsServer(registry)
+    await server.start()
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                text = await response.text()
+    finally:
+        await server.close()
+
+    assert response.status == 200
+    assert "pages_total 7" in text
@@ -1,6 +1,8 @@
+from urllib.parse import urljoin
+
 import pytest
 
-from src.utils import normalize_url
+from src.utils import _resolve, normalize_url, resolve_url, resolve_urls
 
 
 @pytest.mark.parametrize(
@@ -15,3 +17,32 @@ from src.utils import normalize_url
 def test_normalize_url(url: str, expected: str) -> None:
     result = normalize_url(url)
     assert result == expected
+
+
+@pytest.mark.parametrize(
+    "base_url, href, expected",
+    [
+        ("https://monzo.com/blog/", "article", "https://monzo.com/blog/article"),
+        ("https://monzo.com/blog/", "/about/", "https://monzo.com/about"),
+        ("https://monzo.com/blog/", "../about#team", "https://monzo.com/about"),
+        ("https://monzo.com/blog/", "//Example.com/a/../b", "https://example.com/a/../b"),
+        ("https://monzo.com/blog/", "https://monzo.com/a/./b/", "https://monzo.com/a/./b"),
+        ("https://monzo.com/blog/", "http://monzo.com/a/../b", "http://monzo.com/a/../b"),
+        ("https://monzo.com/blog/", "//", "https://monzo.com/blog"),
+    ],
+)
+def test_resolve_url_matches_urljoin(base_url: str, href: str, expected: str) -> None:
+    assert normalize_url(urljoin(base_url, href)) == expected
+    assert resolve_url(base_url, href) == expected
+
+
+def test_resolve_urls_memoises_repeated_hrefs() -> None:
+    hrefs = ["/about", "https://monzo.com/blog", "careers"]
+    resolve_urls("https://monzo.com/page/1", hrefs)
+    hits = _resolve.cache_info().hits
+
+    links = resolve_urls("https://monzo.com/page/2", hrefs)
+
+    assert links == {"https://monzo.com/about", "https://monzo.com/blog", "https://monzo.com/page/careers"}
+    # Only the page-relative href depends on the page's URL.
+    assert _resolve.cache_info().hits == hits + 2